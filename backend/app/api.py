@@ -2,29 +2,23 @@ from __future__ import annotations
 
 import json
 import secrets
-import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, FastAPI, File, Form, HTTPException, UploadFile, Depends
-from fastapi.responses import FileResponse, PlainTextResponse
-from sqlalchemy import select, or_
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from sqlalchemy import select, or_, tuple_
 from sqlalchemy.orm import Session as DBSession
 
 # 통합된 DB 및 모델 사용
-from .db import get_db, SessionLocal, engine, Base, STORAGE_DIR
+from .db import get_db, SessionLocal
 from .models import Session as SessionModel, Turn as TurnModel, Member as MemberModel
 
-from .services.llm import evaluate_transcript, make_assistant_reply, generate_final_report
-from .services.stt import transcribe_audio
-from .services.tts import synthesize_speech_to_wav
-
-AUDIO_DIR = STORAGE_DIR / "audio"
-AUDIO_DIR.mkdir(parents=True, exist_ok=True)
-
-# 테이블 생성 (models.py 정의 기반)
-Base.metadata.create_all(engine)
+from .export import EXPORT_FORMATS, parse_bound, stream_export
+from .scheduler import campaign_stats, plan_campaign
+from .storage import MAX_UPLOAD_BYTES, UploadTooLarge, locate_audio, read_audio
+from .turns import finalize_session, record_assistant_turn, record_user_turn
 
 router = APIRouter()
 
@@ -41,39 +35,20 @@ def _get_session_or_404(s: DBSession, session_id: str) -> SessionModel:
         raise HTTPException(status_code=404, detail="session not found")
     return row
 
-def _next_turn_index(s: DBSession, session_id: str) -> int:
-    q = select(TurnModel.turn_index).where(TurnModel.session_id == session_id).order_by(TurnModel.turn_index.desc()).limit(1)
-    last = s.execute(q).scalar_one_or_none()
-    return int(last + 1) if last is not None else 1
-
-def _load_recent_conversation(s: DBSession, session_id: str, limit: int = 20) -> List[Dict[str, str]]:
-    q = (
-        select(TurnModel)
-        .where(TurnModel.session_id == session_id)
-        .order_by(TurnModel.turn_index.asc())
-    )
-    rows = s.execute(q).scalars().all()
-    subset = rows[-limit:] if len(rows) > limit else rows
-
-    convo: List[Dict[str, str]] = []
-    for r in rows:
-        if not r.text:
-            continue
-        role = "user" if r.speaker == "user" else "assistant"
-        convo.append({"role": role, "content": r.text})
-    return convo 
-
 # --- API ENDPOINTS ---
 
 @router.post("/session/start")
-def start_session(device_info: str = Form(default="")) -> Dict[str, Any]:
+def start_session(device_info: str = Form(default=""), member_no: str = Form(default="")) -> Dict[str, Any]:
     session_id = secrets.token_hex(8)
     started = now_utc_iso()
 
     with db() as s:
+        if member_no and not s.get(MemberModel, member_no):
+            raise HTTPException(status_code=404, detail="member not found")
         row = SessionModel(
             session_id=session_id,
             device_info=device_info[:200] if device_info else None,
+            member_no=member_no or None,
             started_at_utc=started,
             ended_at_utc=None,
         )
@@ -94,16 +69,8 @@ def end_session(session_id: str = Form(...)) -> Dict[str, Any]:
 def finalize_session_endpoint(session_id: str) -> Dict[str, Any]:
     with db() as s:
         row = _get_session_or_404(s, session_id)
-        
-        if not row.ended_at_utc:
-            row.ended_at_utc = now_utc_iso()
-        
-        convo = _load_recent_conversation(s, session_id, limit=100)
-        report_data = generate_final_report(convo)
-        
-        row.final_report = json.dumps(report_data, ensure_ascii=False)
-        s.commit()
-        
+        report_data = finalize_session(s, row)
+
         response_data = {
             "session_id": row.session_id,
             "ended_at_utc": row.ended_at_utc,
@@ -130,10 +97,13 @@ def get_session_report(session_id: str) -> Dict[str, Any]:
 
 @router.get("/storage/audio/{filename}")
 def get_audio(filename: str):
-    p = AUDIO_DIR / filename
-    if not p.exists():
+    loc = locate_audio(filename)
+    if loc is None:
         raise HTTPException(status_code=404, detail="file not found")
-    return FileResponse(str(p), media_type="audio/wav")
+    if isinstance(loc, Path):
+        return FileResponse(str(loc), media_type="audio/wav")
+    # archive 된 세션은 zip 에서 꺼내서 응답
+    return Response(content=read_audio(loc), media_type="audio/wav")
 
 @router.post("/turn/user")
 def user_turn(
@@ -144,58 +114,33 @@ def user_turn(
 ) -> Dict[str, Any]:
     if end_ms < start_ms:
         raise HTTPException(status_code=400, detail="end_ms must be >= start_ms")
+    # 멀티파트 파싱 시점에 크기를 알 수 있으면 디스크에 쓰기 전에 바로 거절
+    if audio.size is not None and audio.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="audio too large")
+
+    original_ext = Path(audio.filename or "").suffix.lower()
+    if not (original_ext[1:].isascii() and original_ext[1:].isalnum()):
+        original_ext = ".webm"
 
     with db() as s:
         _get_session_or_404(s, session_id)
-
-        idx = _next_turn_index(s, session_id)
-
-        original_ext = Path(audio.filename or "").suffix.lower()
-        if not original_ext:
-            original_ext = ".webm"
-            
-        fname = f"{session_id}_user_{uuid.uuid4().hex}{original_ext}"
-        out_path = AUDIO_DIR / fname
-
-        data = audio.file.read()
-        out_path.write_bytes(data)
-
-        transcript = transcribe_audio(out_path)
-        if not transcript:
-            transcript = "(전사 실패)"
-
-        context = _load_recent_conversation(s, session_id, limit=10)
-        llm_eval = evaluate_transcript(transcript, context=context)
-        risk_prob = float(llm_eval.get("risk_probability", 0.0))
-        
-        meta = {
-            "llm_evaluation": llm_eval,
-            "risk_prob": risk_prob,
-        }
-
-        row = TurnModel(
-            session_id=session_id,
-            turn_index=idx,
-            speaker="user",
-            start_ms=int(start_ms),
-            end_ms=int(end_ms),
-            text=transcript,
-            audio_path=str(out_path),
-            meta_json=json.dumps(meta, ensure_ascii=False),
-        )
-        s.add(row)
-        s.commit()
-
-        return {
-            "turn_index": idx,
-            "speaker": "user",
-            "start_ms": int(start_ms),
-            "end_ms": int(end_ms),
-            "transcript": transcript,
-            "risk_prob": risk_prob,
-            "audio_path": str(out_path),
-            "audio_url": f"/storage/audio/{out_path.name}",
-        }
+        # chunk 단위 스트리밍 저장 (전체를 메모리에 올리지 않음)
+        try:
+            turn = record_user_turn(s, session_id, audio.file, original_ext, start_ms, end_ms)
+        except UploadTooLarge:
+            raise HTTPException(status_code=413, detail="audio too large")
+
+    out_path = turn["audio_path"]
+    return {
+        "turn_index": turn["turn_index"],
+        "speaker": "user",
+        "start_ms": int(start_ms),
+        "end_ms": int(end_ms),
+        "transcript": turn["transcript"],
+        "risk_prob": turn["risk_prob"],
+        "audio_path": str(out_path),
+        "audio_url": f"/storage/audio/{out_path.name}",
+    }
 
 
 @router.post("/turn/assistant")
@@ -206,56 +151,77 @@ def assistant_turn(
 ) -> Dict[str, Any]:
     with db() as s:
         _get_session_or_404(s, session_id)
-        idx = _next_turn_index(s, session_id)
-        convo = _load_recent_conversation(s, session_id, limit=20)
-        
-        if not convo:
-            tts_text = "안녕하세요! 건강지킴이입니다. 오늘 하루는 어떠셨나요?"
-            end_call = False
-        else:
-            tts_text, end_call = make_assistant_reply(convo)
-            if not tts_text:
-                tts_text = "응? 다시 말해줄래?"
-
-        fname = f"{session_id}_assistant_{uuid.uuid4().hex}.wav"
-        out_path = AUDIO_DIR / fname
-        synthesize_speech_to_wav(tts_text, out_path)
-
-        meta = {"end_call": end_call}
-
-        row = TurnModel(
-            session_id=session_id,
-            turn_index=idx,
-            speaker="assistant",
-            start_ms=int(start_ms),
-            end_ms=int(end_ms),
-            text=tts_text,
-            audio_path=str(out_path),
-            meta_json=json.dumps(meta),
-        )
-        s.add(row)
-        s.commit()
-
-        return {
-            "turn_index": idx,
-            "speaker": "assistant",
-            "tts_text": tts_text,
-            "audio_path": str(out_path),
-            "audio_url": f"/storage/audio/{out_path.name}",
-            "meta_json": meta,
-        }
+        turn = record_assistant_turn(s, session_id, start_ms, end_ms)
+
+    out_path = turn["audio_path"]
+    return {
+        "turn_index": turn["turn_index"],
+        "speaker": "assistant",
+        "tts_text": turn["tts_text"],
+        "audio_path": str(out_path),
+        "audio_url": f"/storage/audio/{out_path.name}",
+        "meta_json": turn["meta"],
+    }
 
 @router.get("/session/{session_id}/export/txt")
-def export_txt(session_id: str) -> PlainTextResponse:
+def export_txt(session_id: str) -> StreamingResponse:
     with db() as s:
         _get_session_or_404(s, session_id)
-        q = select(TurnModel).where(TurnModel.session_id == session_id).order_by(TurnModel.turn_index.asc())
-        rows = s.execute(q).scalars().all()
 
-    lines = []
-    for r in rows:
-        lines.append(f"[{r.start_ms/1000:.1f}s] {r.speaker}: {r.text or ''}")
-    return PlainTextResponse("\n".join(lines))
+    def lines():
+        # 500 턴씩 읽고 커서를 닫는다 (스트리밍 중 SQLite 쓰기 잠금을 막지 않도록)
+        last = None
+        sep = ""
+        while True:
+            q = (
+                select(TurnModel.turn_index, TurnModel.id, TurnModel.start_ms, TurnModel.speaker, TurnModel.text)
+                .where(TurnModel.session_id == session_id)
+                .order_by(TurnModel.turn_index.asc(), TurnModel.id.asc())
+                .limit(500)
+            )
+            if last is not None:
+                q = q.where(tuple_(TurnModel.turn_index, TurnModel.id) > last)
+            with db() as s:
+                rows = s.execute(q).all()
+            for r in rows:
+                yield f"{sep}[{r.start_ms/1000:.1f}s] {r.speaker}: {r.text or ''}".encode("utf-8")
+                sep = "\n"
+            if len(rows) < 500:
+                return
+            last = (rows[-1].turn_index, rows[-1].id)
+
+    return StreamingResponse(lines(), media_type="text/plain; charset=utf-8")
+
+@router.get("/export/turns")
+def export_turns(
+    format: str = "jsonl",
+    since: str = "",
+    until: str = "",
+    member_no: str = "",
+    after_id: int = 0,
+) -> StreamingResponse:
+    """
+    전체 턴 + 평가 점수 스트리밍 내보내기.
+    since/until 은 세션 시작 시각 기준 (until 미포함). 끊기면 마지막 turn_id 를 after_id 로 넘겨 이어받기.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {EXPORT_FORMATS}")
+    try:
+        filters = dict(
+            since=parse_bound(since),
+            until=parse_bound(until),
+            member_no=member_no or None,
+            after_id=after_id,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="since/until must be ISO dates")
+
+    media_type = "text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson; charset=utf-8"
+    return StreamingResponse(
+        stream_export(format, header=after_id == 0, **filters),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="turns.{format}"'},
+    )
 
 @router.get("/members")
 def list_members(
@@ -333,4 +299,16 @@ def seed_members() -> Dict[str, Any]:
             )
             s.add(m)
         s.commit()
-    return {"inserted": 10}
\ No newline at end of file
+    return {"inserted": 10}
+
+@router.post("/campaigns")
+def create_campaign(name: str = Form(default="daily"), min_gap_hours: float = Form(default=20.0)) -> Dict[str, Any]:
+    # 실행은 별도 워커에서: python -m app.scheduler run <campaign_id>
+    return plan_campaign(name, min_gap_hours=min_gap_hours)
+
+@router.get("/campaigns/{campaign_id}")
+def get_campaign(campaign_id: str) -> Dict[str, Any]:
+    try:
+        return campaign_stats(campaign_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="campaign not found")
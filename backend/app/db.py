@@ -1,23 +1,24 @@
 from __future__ import annotations
 
+import os
+import sys
+import zlib
 from pathlib import Path
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 # 경로를 backend/storage/app.sqlite3 로 명확하게 지정
 ROOT_DIR = Path(__file__).resolve().parents[2]
-STORAGE_DIR = ROOT_DIR / "storage"
+STORAGE_DIR = Path(os.getenv("STORAGE_DIR", str(ROOT_DIR / "storage")))
 DB_PATH = STORAGE_DIR / "app.sqlite3"
 
-# 저장소 디렉토리 생성
-STORAGE_DIR.mkdir(parents=True, exist_ok=True)
-
 # SQLite URL
 DB_URL = f"sqlite:///{DB_PATH}"
 
 engine = create_engine(
     DB_URL,
-    connect_args={"check_same_thread": False},  # SQLite & FastAPI 필수 설정
+    connect_args={"check_same_thread": False, "timeout": 30},  # SQLite & FastAPI 필수 설정 (동시 쓰기 대기 30초)
     future=True
 )
 
@@ -30,4 +31,71 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def _schema_version() -> int:
+    """모델 정의(테이블/컬럼/인덱스) 지문. PRAGMA user_version 에 기록해 두고 같으면 DDL 을 건너뛴다."""
+    parts = []
+    for t in sorted(Base.metadata.tables.values(), key=lambda t: t.name):
+        cols = ",".join(c.name for c in t.columns)
+        idxs = ",".join(sorted(str(i.name) for i in t.indexes))
+        parts.append(f"{t.name}:{cols}:{idxs}")
+    return (zlib.crc32("|".join(parts).encode()) & 0x7FFFFFFF) or 1
+
+
+def init_db():
+    """
+    스키마 준비. 배포 시 워커를 띄우기 전에 `python -m app.db init` 으로 한 번 실행한다.
+    앱 lifespan / CLI 에서도 부르지만, 스키마가 최신이면 user_version 한 번 읽고 끝난다.
+    여러 프로세스가 동시에 불러도 DB 배타 잠금 안에서 한 프로세스만 DDL 을 실행한다.
+    """
+    from . import models  # noqa: F401  (테이블 등록)
+
+    STORAGE_DIR.mkdir(parents=True, exist_ok=True)
+    version = _schema_version()
+    with engine.connect() as conn:
+        if conn.exec_driver_sql("PRAGMA user_version").scalar() == version:
+            return
+
+    with engine.connect() as conn:
+        conn.exec_driver_sql("BEGIN EXCLUSIVE")
+        try:
+            # 잠금을 기다리는 동안 다른 프로세스가 끝냈을 수 있으므로 다시 확인
+            if conn.exec_driver_sql("PRAGMA user_version").scalar() != version:
+                Base.metadata.create_all(bind=conn)
+                _add_missing_columns(conn)
+                conn.exec_driver_sql(f"PRAGMA user_version = {version}")
+            conn.exec_driver_sql("COMMIT")
+        except BaseException:
+            conn.exec_driver_sql("ROLLBACK")
+            raise
+
+
+def _add_missing_columns(conn):
+    """
+    create_all 은 기존 테이블에 컬럼을 추가하지 않으므로,
+    모델에 새로 생긴 nullable 컬럼/인덱스만 ALTER TABLE 로 보충한다.
+    init_db 의 배타 잠금 안에서 같은 연결로 실행하며, 이미 있는 컬럼은 오류 없이 건너뛴다.
+    """
+    insp = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {c["name"] for c in insp.get_columns(table.name)}
+        for col in table.columns:
+            if col.name in existing or not col.nullable:
+                continue
+            col_type = col.type.compile(dialect=conn.dialect)
+            try:
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {col.name} {col_type}"))
+            except OperationalError as e:
+                if "duplicate column name" not in str(e):
+                    raise
+        for idx in table.indexes:
+            idx.create(conn, checkfirst=True)
+
+if __name__ == "__main__":
+    # 사용법 (backend 디렉토리에서): python -m app.db init
+    if sys.argv[1:] != ["init"]:
+        raise SystemExit("usage: python -m app.db init")
+    init_db()
+    print(f"schema ready: {DB_PATH}")
@@ -0,0 +1,326 @@
+# backend/app/export.py
+"""
+세션/턴/평가 대량 내보내기 (스트리밍)
+
+턴 id 순서로 배치 단위(keyset: id > 마지막 id LIMIT n) 로 읽어 직렬화하므로
+메모리 사용량은 전체 건수와 무관하다. 배치마다 짧게 읽고 커서를 닫으므로
+느린 클라이언트가 내보내기를 오래 붙잡고 있어도 SQLite 쓰기를 막지 않는다.
+모든 레코드에 turn_id 가 있어, 마지막 turn_id 를 after_id 로 넘기면 이어서 받을 수 있다.
+
+CLI (backend 디렉토리에서):
+  python -m app.export -o turns.jsonl [--format jsonl|csv] [--since 2026-01-01] [--until 2026-02-01]
+                       [--member 1001] [--after-id N | --resume]
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session as DBSession
+
+from .models import Session as SessionModel, Turn as TurnModel
+from .turns import split_user_meta
+
+EXPORT_FORMATS = ("jsonl", "csv")
+EXPORT_BATCH = 2000
+
+# CSV 로 펼칠 평가 점수 (llm.EVAL_SCHEMA 기준)
+SCORE_FIELDS = [
+    ("semantic_impairment", "pronoun_overuse"),
+    ("semantic_impairment", "vagueness"),
+    ("semantic_impairment", "lexical_poverty"),
+    ("semantic_impairment", "repetition"),
+    ("information_impairment", "missing_core_info"),
+    ("information_impairment", "low_specificity"),
+    ("information_impairment", "inappropriate_reference"),
+    ("syntactic_impairment", "verb_reduction"),
+    ("syntactic_impairment", "sentence_fragments"),
+    ("syntactic_impairment", "syntactic_simplification"),
+    ("acoustic_abnormality", "pause_count"),
+    ("acoustic_abnormality", "pause_ratio"),
+    ("acoustic_abnormality", "mean_pause_sec"),
+    ("acoustic_abnormality", "speech_rate_sps"),
+]
+
+BASE_COLUMNS = [
+    "turn_id",
+    "session_id",
+    "member_no",
+    "session_started_at_utc",
+    "turn_index",
+    "speaker",
+    "start_ms",
+    "end_ms",
+    "text",
+    "risk_prob",
+]
+CSV_COLUMNS = BASE_COLUMNS + [f"{g}.{k}" for g, k in SCORE_FIELDS]
+
+
+def parse_bound(value: str) -> Optional[str]:
+    """날짜/시각 문자열을 저장 형식(UTC isoformat)으로 정규화. 빈 값은 None."""
+    if not value:
+        return None
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat()
+
+
+def _query(since: Optional[str], until: Optional[str], member_no: Optional[str], after_id: int, limit: int):
+    q = (
+        select(
+            TurnModel.id,
+            TurnModel.session_id,
+            SessionModel.member_no,
+            SessionModel.started_at_utc,
+            TurnModel.turn_index,
+            TurnModel.speaker,
+            TurnModel.start_ms,
+            TurnModel.end_ms,
+            TurnModel.text,
+            TurnModel.meta_json,
+        )
+        .join(SessionModel, SessionModel.session_id == TurnModel.session_id)
+        .where(TurnModel.id > after_id)
+        .order_by(TurnModel.id.asc())
+        .limit(limit)
+    )
+    if since:
+        q = q.where(SessionModel.started_at_utc >= since)
+    if until:
+        q = q.where(SessionModel.started_at_utc < until)
+    if member_no:
+        q = q.where(SessionModel.member_no == member_no)
+    return q
+
+
+def _iter_rows(
+    s: DBSession,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    member_no: Optional[str] = None,
+    after_id: int = 0,
+) -> Iterator[Any]:
+    """
+    한 배치씩 모두 읽어(.all()) 커서를 닫은 뒤 내보낸다.
+    하나의 커서를 끝까지 열어두면 그동안 SHARED 잠금이 유지되어 다른 연결의 쓰기가 'database is locked' 로 실패한다.
+    """
+    last_id = after_id
+    while True:
+        rows = s.execute(_query(since, until, member_no, last_id, EXPORT_BATCH)).all()
+        if not rows:
+            return
+        yield from rows
+        if len(rows) < EXPORT_BATCH:
+            return
+        last_id = rows[-1][0]
+
+
+def iter_turn_records(
+    s: DBSession,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    member_no: Optional[str] = None,
+    after_id: int = 0,
+) -> Iterator[Dict[str, Any]]:
+    for row in _iter_rows(s, since, until, member_no, after_id):
+        meta: Dict[str, Any] = {}
+        if row.meta_json:
+            try:
+                meta = json.loads(row.meta_json)
+            except ValueError:
+                meta = {}
+        yield {
+            "turn_id": row.id,
+            "session_id": row.session_id,
+            "member_no": row.member_no,
+            "session_started_at_utc": row.started_at_utc,
+            "turn_index": row.turn_index,
+            "speaker": row.speaker,
+            "start_ms": row.start_ms,
+            "end_ms": row.end_ms,
+            "text": row.text,
+            "risk_prob": meta.get("risk_prob"),
+            "evaluation": meta.get("llm_evaluation"),
+        }
+
+
+def _splice_meta(meta_json: Optional[str]) -> str:
+    """
+    meta_json 에서 risk_prob / llm_evaluation 을 원문 그대로 잘라 '"risk_prob": .., "evaluation": ..' 조각을 만든다.
+    저장된 평가 JSON 을 다시 파싱/직렬화하지 않으므로 JSONL 내보내기의 대부분 비용이 사라진다.
+    레이아웃은 turns.dump_user_meta 가 정하고, 그 형식이 아니면 json.loads 로 처리한다.
+    """
+    parts = split_user_meta(meta_json)
+    if parts is not None:
+        return f'"risk_prob": {parts[0]}, "evaluation": {parts[1]}'
+
+    meta: Dict[str, Any] = {}
+    if meta_json:
+        try:
+            meta = json.loads(meta_json)
+        except ValueError:
+            meta = {}
+    return (
+        f'"risk_prob": {json.dumps(meta.get("risk_prob"))}, '
+        f'"evaluation": {json.dumps(meta.get("llm_evaluation"), ensure_ascii=False)}'
+    )
+
+
+def iter_jsonl(
+    s: DBSession,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    member_no: Optional[str] = None,
+    after_id: int = 0,
+) -> Iterator[str]:
+    # iter_turn_records 와 같은 키/순서. 턴 필드만 직렬화하고 평가는 원문을 이어붙인다.
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
+    buf: List[str] = []
+    for turn_id, session_id, member, started, turn_index, speaker, start_ms, end_ms, text, meta_json in _iter_rows(
+        s, since, until, member_no, after_id
+    ):
+        head = dumps(
+            {
+                "turn_id": turn_id,
+                "session_id": session_id,
+                "member_no": member,
+                "session_started_at_utc": started,
+                "turn_index": turn_index,
+                "speaker": speaker,
+                "start_ms": start_ms,
+                "end_ms": end_ms,
+                "text": text,
+            }
+        )
+        buf.append(f"{head[:-1]}, {_splice_meta(meta_json)}}}")
+        if len(buf) >= EXPORT_BATCH:
+            yield "\n".join(buf) + "\n"
+            buf.clear()
+    if buf:
+        yield "\n".join(buf) + "\n"
+
+
+def _csv_row(rec: Dict[str, Any]) -> List[Any]:
+    # 한 줄에 한 턴 (줄 단위 이어받기를 위해 본문 개행은 공백으로)
+    rec["text"] = (rec["text"] or "").replace("\r", " ").replace("\n", " ")
+    row = [rec[c] for c in BASE_COLUMNS]
+    ev = rec["evaluation"] or {}
+    for group, key in SCORE_FIELDS:
+        g = ev.get(group)
+        row.append(g.get(key) if isinstance(g, dict) else None)
+    return row
+
+
+def iter_csv(s: DBSession, header: bool = True, **filters: Any) -> Iterator[str]:
+    out = io.StringIO()
+    w = csv.writer(out)
+    if header:
+        w.writerow(CSV_COLUMNS)
+    n = 0
+    for rec in iter_turn_records(s, **filters):
+        w.writerow(_csv_row(rec))
+        n += 1
+        if n % EXPORT_BATCH == 0:
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+    if out.tell():
+        yield out.getvalue()
+
+
+def iter_export(s: DBSession, fmt: str, header: bool = True, **filters: Any) -> Iterator[str]:
+    if fmt == "csv":
+        return iter_csv(s, header=header, **filters)
+    return iter_jsonl(s, **filters)
+
+
+def stream_export(fmt: str, **filters: Any) -> Iterator[bytes]:
+    """StreamingResponse 용. 응답이 끝날 때까지 자체 DB 세션을 유지한다."""
+    from .db import SessionLocal
+
+    with SessionLocal() as s:
+        for chunk in iter_export(s, fmt, **filters):
+            yield chunk.encode("utf-8")
+
+
+# --- CLI ---
+
+def _resume_point(path: str, fmt: str) -> int:
+    """
+    기존 출력 파일의 마지막 완전한 줄에서 turn_id 를 읽는다.
+    중간에 끊겨 남은 불완전한 줄은 잘라낸다.
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        tail_start = max(0, size - 1024 * 1024)
+        f.seek(tail_start)
+        tail = f.read()
+        cut = tail.rfind(b"\n")
+        if cut == -1:
+            if tail_start:
+                raise SystemExit(f"cannot find resume point in {path}")
+            f.truncate(0)
+            return 0
+        f.truncate(tail_start + cut + 1)
+        lines = tail[: cut + 1].splitlines()
+
+    last = lines[-1].decode("utf-8") if lines else ""
+    try:
+        if fmt == "csv":
+            return int(next(csv.reader([last]))[0])
+        return int(json.loads(last)["turn_id"])
+    except (ValueError, KeyError, IndexError, StopIteration):
+        return 0
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from .db import SessionLocal, init_db
+
+    parser = argparse.ArgumentParser(prog="python -m app.export")
+    parser.add_argument("-o", "--output", default="-", help="출력 파일 (기본: stdout)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="jsonl")
+    parser.add_argument("--since", default="", help="세션 시작 시각 하한 (포함)")
+    parser.add_argument("--until", default="", help="세션 시작 시각 상한 (미포함)")
+    parser.add_argument("--member", default="", help="회원 번호")
+    parser.add_argument("--after-id", type=int, default=0)
+    parser.add_argument("--resume", action="store_true", help="출력 파일 끝의 turn_id 다음부터 이어쓰기")
+    args = parser.parse_args(argv)
+
+    after_id = args.after_id
+    append = False
+    if args.resume and args.output != "-":
+        after_id = _resume_point(args.output, args.format)
+        append = after_id > 0
+
+    init_db()
+    filters = dict(
+        since=parse_bound(args.since),
+        until=parse_bound(args.until),
+        member_no=args.member or None,
+        after_id=after_id,
+    )
+
+    out = sys.stdout if args.output == "-" else open(args.output, "a" if append else "w", encoding="utf-8", newline="")
+    try:
+        with SessionLocal() as s:
+            for chunk in iter_export(s, args.format, header=not append, **filters):
+                out.write(chunk)
+                out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
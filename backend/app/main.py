@@ -1,24 +1,110 @@
 from __future__ import annotations
 
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
 
 from dotenv import load_dotenv
 load_dotenv()
 
 
-from .db import engine
-from .models import Base
+from .db import ROOT_DIR, SessionLocal, init_db
 from .api import router
+from .storage import AUDIO_DIR, MAX_UPLOAD_BYTES, ensure_dirs
+from .services.acoustic import shutdown_pool
+
+FRONTEND_DIR = ROOT_DIR / "frontend"
+
+
+# import 시점에는 아무 부작용 없음. 스키마/디렉토리 준비는 워커 시작 시 한 번만.
+# 스키마는 배포 시 `python -m app.db init` 으로 미리 만들어 두면 여기서는 버전 확인만 한다.
+# (미리 안 했어도 여러 워커 중 한 프로세스만 DDL 을 실행한다)
+# OpenAI 클라이언트는 첫 요청 때 만들어진다. (services/openai_client.py)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_db()
+    ensure_dirs()
+    app.state.ready = True
+    yield
+    app.state.ready = False
+    shutdown_pool()
+
+
+app = FastAPI(title="Naduri Backend", lifespan=lifespan)
+app.state.ready = False
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class UploadLimitMiddleware:
+    """
+    /turn/user 요청 본문 크기 제한.
+    Content-Length 가 있으면 본문을 읽기 전에, 없으면(chunked) 받는 도중 한도를 넘는 순간 끊는다.
+    멀티파트 파서가 본문 전체를 임시 파일에 spool 하기 전에 중단되므로 디스크도 보호된다.
+    """
+
+    def __init__(self, app, max_body: int):
+        self.app = app
+        self.max_body = max_body
+
+    async def _reject(self, scope, receive, send):
+        await JSONResponse({"detail": "audio too large"}, status_code=413)(scope, receive, send)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] != "/turn/user":
+            await self.app(scope, receive, send)
+            return
 
-app = FastAPI(title="Naduri Backend")
+        cl = dict(scope["headers"]).get(b"content-length", b"")
+        if cl.isdigit() and int(cl) > self.max_body:
+            await self._reject(scope, receive, send)
+            return
 
-Base.metadata.create_all(bind=engine)
+        received = 0
+        exceeded = False
+        started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body:
+                    exceeded = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def guarded_send(message):
+            nonlocal started
+            # 파싱 중단 후 FastAPI 가 만드는 400 응답 대신 413 을 보낸다
+            if exceeded:
+                if not started:
+                    started = True
+                    await self._reject(scope, receive, send)
+                return
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except _BodyTooLarge:
+            if not started:
+                await self._reject(scope, receive, send)
+
+
+# 업로드 크기 초과 요청 거절 (멀티파트 헤더 여유분 64KB)
+app.add_middleware(UploadLimitMiddleware, max_body=MAX_UPLOAD_BYTES + 64 * 1024)
 
 # RN 개발용 CORS(나중에 도메인 제한)
+# 마지막에 추가한 미들웨어가 가장 바깥이므로, 413 같은 조기 응답에도 CORS 헤더가 붙도록 CORS 를 마지막에 둔다.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -27,10 +113,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.get("/healthz")
+def healthz():
+    return {"ok": True}
+
+
+@app.get("/readyz")
+def readyz():
+    checks = {
+        "started": bool(app.state.ready),
+        "db": False,
+        "storage": AUDIO_DIR.is_dir() and os.access(AUDIO_DIR, os.W_OK),
+        # OPENAI_FAKE=1 이면 키 없이 가짜 백엔드로 동작 (services/openai_client.py)
+        "openai_key": bool(os.getenv("OPENAI_API_KEY") or os.getenv("OPENAI_FAKE")),
+    }
+    try:
+        with SessionLocal() as s:
+            s.execute(text("SELECT 1"))
+        checks["db"] = True
+    except Exception:
+        pass
+
+    ready = all(checks.values())
+    return JSONResponse({"ready": ready, "checks": checks}, status_code=200 if ready else 503)
+
+
 app.include_router(router)
 
 app.mount(
     "/",
-    StaticFiles(directory="../frontend", html=True),
+    StaticFiles(directory=str(FRONTEND_DIR), html=True),
     name="frontend",
-)
\ No newline at end of file
+)
@@ -1,16 +1,23 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, String, Integer, Text, ForeignKey
+from sqlalchemy import Column, String, Integer, Float, Text, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from .db import Base
 
 class Session(Base):
     __tablename__ = "sessions"
+    __table_args__ = (
+        Index("ix_sessions_audio_tier", "audio_tier", "started_at_utc"),
+    )
 
     session_id = Column(String(32), primary_key=True)
     device_info = Column(String(200), nullable=True)
     started_at_utc = Column(String(40), nullable=False)
     ended_at_utc = Column(String(40), nullable=True)
+    # 통화 대상 회원 (직접 시작한 통화는 비어 있을 수 있음)
+    member_no = Column(String(32), ForeignKey("members.member_no"), nullable=True, index=True)
+    # 오디오 보존 단계: None(hot) / "archived" / "deleted" (storage.apply_retention 이 기록)
+    audio_tier = Column(String(16), nullable=True)
     
     # [NEW] 분석 결과 영구 저장용 컬럼 (JSON 문자열 저장)
     final_report = Column(Text, nullable=True)
@@ -28,7 +35,7 @@ class Turn(Base):
     start_ms = Column(Integer, nullable=False)
     end_ms = Column(Integer, nullable=False)
     text = Column(Text, nullable=True)
-    audio_path = Column(String(500), nullable=True)
+    audio_path = Column(String(500), nullable=True, index=True)
     meta_json = Column(Text, nullable=True)
 
     session = relationship("Session", back_populates="turns")
@@ -43,4 +50,54 @@ class Member(Base):
     risk = Column(Integer, nullable=False)  # 0~100
     customer_phone = Column(String(30), nullable=False)
     guardian_phone = Column(String(30), nullable=False)
-    created_at_utc = Column(String(40), nullable=False)
\ No newline at end of file
+    created_at_utc = Column(String(40), nullable=False)
+
+
+class Campaign(Base):
+    __tablename__ = "campaigns"
+
+    campaign_id = Column(String(32), primary_key=True)
+    name = Column(String(100), nullable=False)
+    status = Column(String(16), nullable=False)  # "planned" / "running" / "done"
+    created_at_utc = Column(String(40), nullable=False)
+    started_at_utc = Column(String(40), nullable=True)
+    finished_at_utc = Column(String(40), nullable=True)
+    # 이 캠페인 통화에서 나간 OpenAI 요청 수
+    stt_requests = Column(Integer, nullable=True)
+    chat_requests = Column(Integer, nullable=True)
+    tts_requests = Column(Integer, nullable=True)
+
+    tasks = relationship("CampaignTask", back_populates="campaign", cascade="all, delete-orphan")
+
+
+class CampaignTask(Base):
+    """캠페인 발신 대기열 (재시작해도 유지되도록 DB 에 저장)"""
+    __tablename__ = "campaign_tasks"
+    __table_args__ = (
+        UniqueConstraint("campaign_id", "member_no"),
+        Index("ix_campaign_tasks_queue", "campaign_id", "status", "priority"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    campaign_id = Column(String(32), ForeignKey("campaigns.campaign_id"), nullable=False)
+    member_no = Column(String(32), ForeignKey("members.member_no"), nullable=False)
+    priority = Column(Float, nullable=False)
+    status = Column(String(16), nullable=False)  # "queued" / "running" / "done" / "no_answer" / "failed"
+    attempts = Column(Integer, nullable=False, default=0)
+    # 실패 후 재시도 대기 (이 시각 전에는 꺼내지 않음)
+    not_before_utc = Column(String(40), nullable=True)
+    session_id = Column(String(32), nullable=True)
+    error = Column(Text, nullable=True)
+    started_at_utc = Column(String(40), nullable=True)
+    finished_at_utc = Column(String(40), nullable=True)
+
+    campaign = relationship("Campaign", back_populates="tasks")
+
+
+class ApiQuota(Base):
+    """OpenAI 분당 한도 토큰 버킷 상태 (프로세스 간 공유, services/quota.py)"""
+    __tablename__ = "api_quotas"
+
+    kind = Column(String(16), primary_key=True)  # "stt" / "chat" / "tts"
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False)  # epoch seconds
@@ -0,0 +1,462 @@
+# backend/app/scheduler.py
+"""
+정기 안부전화 캠페인 스케줄러
+
+1) plan: 회원별 발신 작업을 만든다. 우선순위 = 위험도 + 마지막 통화 이후 경과일
+2) run : 우선순위 순으로 작업을 꺼내 동시 통화 수를 제한해 실행한다.
+         STT/chat/TTS 호출은 services/quota.py 의 분당 토큰 버킷(웹 서버와 공유)을 거치고,
+         캠페인별 요청 수는 campaigns 테이블에 누적한다.
+
+대기열은 campaign_tasks 테이블에 있으므로 프로세스가 죽어도 다시 run 하면 이어서 진행한다.
+실패한 통화는 지수 백오프(RETRY_BASE_SEC, 2배씩) 뒤에 MAX_ATTEMPTS 번까지 다시 시도하고,
+실패한 통화가 남긴 세션/턴/오디오는 지운다.
+(SQLite 라서 한 캠페인은 한 프로세스에서만 run 한다)
+
+실제 전화 연동은 아직 없으므로 기본 발신자는 SimulatedCallee 로 통화를 흉내낸다.
+OPENAI_FAKE=1 과 함께 쓰면 네트워크 없이 처리량을 잴 수 있다.
+
+CLI (backend 디렉토리에서):
+  python -m app.scheduler plan [--name daily] [--min-gap-hours 20]
+  python -m app.scheduler run CAMPAIGN_ID [--concurrency 8] [--rpm-stt N] [--rpm-chat N] [--rpm-tts N]
+  python -m app.scheduler status CAMPAIGN_ID
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import logging
+import os
+import random
+import secrets
+import time
+import wave
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, func, insert, or_, select, update
+from sqlalchemy.exc import OperationalError
+
+from .db import SessionLocal
+from .models import (
+    Campaign as CampaignModel,
+    CampaignTask as TaskModel,
+    Member as MemberModel,
+    Session as SessionModel,
+    Turn as TurnModel,
+)
+from .services import quota
+from .storage import delete_session_audio
+from .turns import finalize_session, record_assistant_turn, record_user_turn
+
+logger = logging.getLogger(__name__)
+
+CAMPAIGN_CONCURRENCY = int(os.getenv("CAMPAIGN_CONCURRENCY", "8"))
+MAX_ATTEMPTS = 3
+RETRY_BASE_SEC = float(os.getenv("CAMPAIGN_RETRY_BASE_SEC", "30"))
+MAX_CALL_TURNS = 8
+
+# 우선순위 가중치 (합 1.0). 경과일은 RECENCY_SATURATION_DAYS 에서 최대.
+RISK_WEIGHT = 0.6
+RECENCY_WEIGHT = 0.4
+RECENCY_SATURATION_DAYS = 7.0
+
+_PLAN_BATCH = 1000
+
+Caller = Callable[[str], Optional[str]]
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def priority_for(risk: int, days_since_last: Optional[float]) -> float:
+    """risk: 0~100, days_since_last: 통화 이력이 없으면 None (최대 가중)"""
+    r = max(0, min(100, int(risk))) / 100.0
+    d = RECENCY_SATURATION_DAYS if days_since_last is None else days_since_last
+    recency = max(0.0, min(1.0, d / RECENCY_SATURATION_DAYS))
+    return round(RISK_WEIGHT * r + RECENCY_WEIGHT * recency, 6)
+
+
+# --- PLAN ---
+
+def plan_campaign(name: str = "daily", min_gap_hours: float = 20.0, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    전체 회원에 대해 발신 작업을 만든다.
+    최근 min_gap_hours 안에 통화한 회원은 건너뛴다. (끝나지 않은 세션은 통화로 치지 않음)
+    """
+    now = now or datetime.now(timezone.utc)
+    campaign_id = secrets.token_hex(8)
+
+    last_call = (
+        select(SessionModel.member_no, func.max(SessionModel.started_at_utc).label("last_at"))
+        .where(SessionModel.member_no.is_not(None), SessionModel.ended_at_utc.is_not(None))
+        .group_by(SessionModel.member_no)
+        .subquery()
+    )
+    q = (
+        select(MemberModel.member_no, MemberModel.risk, last_call.c.last_at)
+        .outerjoin(last_call, last_call.c.member_no == MemberModel.member_no)
+    )
+
+    planned = skipped = 0
+    with SessionLocal() as s:
+        s.add(CampaignModel(campaign_id=campaign_id, name=name[:100], status="planned", created_at_utc=now.isoformat()))
+        s.flush()
+
+        batch: List[Dict[str, Any]] = []
+        for member_no, risk, last_at in s.execute(q).all():
+            days = None
+            if last_at:
+                days = (now - datetime.fromisoformat(last_at)).total_seconds() / 86400.0
+                if days * 24.0 < min_gap_hours:
+                    skipped += 1
+                    continue
+            batch.append(
+                {
+                    "campaign_id": campaign_id,
+                    "member_no": member_no,
+                    "priority": priority_for(risk, days),
+                    "status": "queued",
+                    "attempts": 0,
+                }
+            )
+            if len(batch) >= _PLAN_BATCH:
+                s.execute(insert(TaskModel), batch)
+                planned += len(batch)
+                batch = []
+        if batch:
+            s.execute(insert(TaskModel), batch)
+            planned += len(batch)
+        s.commit()
+
+    return {"campaign_id": campaign_id, "planned": planned, "skipped_recent": skipped}
+
+
+# --- SIMULATED CALL ---
+
+class SimulatedCallee:
+    """가상 수신자: answer_rate 확률로 전화를 받고, 받으면 발화/휴지가 섞인 짧은 WAV 로 대답한다."""
+
+    SAMPLE_RATE = 16000
+
+    def __init__(self, answer_rate: float = 0.9, seed: Optional[int] = None):
+        self.answer_rate = answer_rate
+        self.rng = random.Random(seed)
+
+    def answers(self) -> bool:
+        return self.rng.random() < self.answer_rate
+
+    def speak(self) -> bytes:
+        """유성음(배음이 있는 톤) 구간과 무음 구간을 번갈아 만든 16kHz mono 16bit WAV"""
+        sr = self.SAMPLE_RATE
+        parts: List[np.ndarray] = []
+        for i in range(self.rng.randint(2, 4)):
+            if i:
+                parts.append(np.zeros(int(self.rng.uniform(0.2, 0.7) * sr), dtype=np.float32))
+            f0 = self.rng.uniform(110.0, 220.0)
+            t = np.arange(int(self.rng.uniform(0.3, 0.9) * sr), dtype=np.float32) / sr
+            tone = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in (1, 2, 3))
+            parts.append((0.2 * tone * np.hanning(t.size)).astype(np.float32))
+        pcm = (np.concatenate(parts) * 32767).astype("<i2")
+
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(sr)
+            w.writeframes(pcm.tobytes())
+        return buf.getvalue()
+
+
+def simulated_call(member_no: str, callee: SimulatedCallee, max_turns: int = MAX_CALL_TURNS) -> Optional[str]:
+    """
+    /turn/assistant, /turn/user, /finalize 와 같은 코드(turns.py)로 통화 한 건을 진행한다.
+    Returns: session_id, 받지 않으면 None
+    """
+    if not callee.answers():
+        return None
+
+    session_id = secrets.token_hex(8)
+    try:
+        with SessionLocal() as s:
+            row = SessionModel(
+                session_id=session_id,
+                device_info="campaign",
+                member_no=member_no,
+                started_at_utc=_now_iso(),
+            )
+            s.add(row)
+            s.commit()
+
+            for _ in range(max_turns):
+                if record_assistant_turn(s, session_id, 0, 0)["end_call"]:
+                    break
+                record_user_turn(s, session_id, io.BytesIO(callee.speak()), "wav", 0, 0)
+
+            finalize_session(s, row)
+    except BaseException:
+        _discard_session(session_id)
+        raise
+
+    return session_id
+
+
+def _discard_session(session_id: str) -> None:
+    """실패한 통화가 남긴 세션/턴/오디오 삭제 (재시도하면 새 세션으로 다시 건다)"""
+    with SessionLocal() as s:
+        delete_session_audio(s, session_id)
+        s.execute(delete(TurnModel).where(TurnModel.session_id == session_id))
+        s.execute(delete(SessionModel).where(SessionModel.session_id == session_id))
+        s.commit()
+
+
+# --- RUN ---
+
+def _requeue_stale(campaign_id: str) -> int:
+    """이전 실행이 중단되어 running 으로 남은 작업을 다시 대기열로"""
+    with SessionLocal() as s:
+        n = s.execute(
+            update(TaskModel)
+            .where(TaskModel.campaign_id == campaign_id, TaskModel.status == "running")
+            .values(status="queued")
+        ).rowcount
+        s.commit()
+    return n
+
+
+def _claim_next(campaign_id: str) -> Optional[Tuple[int, str]]:
+    with SessionLocal() as s:
+        q = (
+            select(TaskModel.id, TaskModel.member_no)
+            .where(
+                TaskModel.campaign_id == campaign_id,
+                TaskModel.status == "queued",
+                or_(TaskModel.not_before_utc.is_(None), TaskModel.not_before_utc <= _now_iso()),
+            )
+            .order_by(TaskModel.priority.desc(), TaskModel.id.asc())
+            .limit(1)
+        )
+        row = s.execute(q).first()
+        if row is None:
+            return None
+        s.execute(
+            update(TaskModel)
+            .where(TaskModel.id == row.id)
+            .values(status="running", attempts=TaskModel.attempts + 1, started_at_utc=_now_iso())
+        )
+        s.commit()
+        return int(row.id), row.member_no
+
+
+def _add_api_requests(campaign_id: str, counts: Dict[str, int]) -> None:
+    if not counts:
+        return
+    values = {
+        f"{kind}_requests": func.coalesce(getattr(CampaignModel, f"{kind}_requests"), 0) + n
+        for kind, n in counts.items()
+        if kind in ("stt", "chat", "tts")
+    }
+    _set_campaign(campaign_id, **values)
+
+
+def _next_retry_delay(campaign_id: str) -> Optional[float]:
+    """백오프 중인 작업이 꺼낼 수 있게 될 때까지 남은 초. 대기 중인 작업이 없으면 None."""
+    with SessionLocal() as s:
+        queued, earliest = s.execute(
+            select(func.count(), func.min(TaskModel.not_before_utc))
+            .where(TaskModel.campaign_id == campaign_id, TaskModel.status == "queued")
+        ).one()
+    if not queued:
+        return None
+    if not earliest:
+        return 0.0
+    return max(0.0, (datetime.fromisoformat(earliest) - datetime.now(timezone.utc)).total_seconds())
+
+
+def _failure_values(task_id: int, error: str) -> Dict[str, Any]:
+    with SessionLocal() as s:
+        attempts = s.execute(select(TaskModel.attempts).where(TaskModel.id == task_id)).scalar_one()
+    values: Dict[str, Any] = {"status": "failed", "error": error[:500], "finished_at_utc": _now_iso()}
+    if attempts < MAX_ATTEMPTS:
+        # 일시적 오류가 곧바로 재시도되어 시도 횟수를 다 써버리지 않도록 백오프
+        delay = RETRY_BASE_SEC * 2 ** (attempts - 1)
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+        values.update(status="queued", not_before_utc=retry_at.isoformat())
+    return values
+
+
+def _update_task(task_id: int, values: Dict[str, Any], tries: int = 3) -> None:
+    # 통화는 이미 끝났으므로 결과 기록은 잠깐의 'database is locked' 정도는 재시도한다
+    for i in range(tries):
+        try:
+            with SessionLocal() as s:
+                s.execute(update(TaskModel).where(TaskModel.id == task_id).values(**values))
+                s.commit()
+            return
+        except OperationalError:
+            if i == tries - 1:
+                raise
+            time.sleep(0.5 * (i + 1))
+
+
+def _run_task(campaign_id: str, task_id: int, member_no: str, caller: Caller) -> None:
+    with quota.track() as used:
+        try:
+            session_id = caller(member_no)
+            values: Dict[str, Any] = {
+                "status": "done" if session_id else "no_answer",
+                "session_id": session_id,
+                "error": None,
+                "finished_at_utc": _now_iso(),
+            }
+        except Exception as e:
+            values = _failure_values(task_id, f"{type(e).__name__}: {e}")
+
+    _update_task(task_id, values)
+    try:
+        _add_api_requests(campaign_id, used)
+    except Exception:
+        # 작업 결과는 이미 기록됨. 요청 수 집계만 빠진다.
+        logger.exception("campaign %s: failed to record api request counts", campaign_id)
+
+
+def _release_task(task_id: int, exc: BaseException) -> None:
+    """_run_task 자체가 실패해 running 으로 남은 작업을 재시도 대기열(또는 failed)로 돌린다."""
+    try:
+        _update_task(task_id, _failure_values(task_id, f"{type(exc).__name__}: {exc}"))
+    except Exception:
+        # 그래도 실패하면 running 으로 남고, 대기열이 빈 뒤 _requeue_stale 로 다시 넣는다
+        logger.exception("task %s: failed to release after error", task_id)
+
+
+def _set_campaign(campaign_id: str, **values: Any) -> None:
+    with SessionLocal() as s:
+        s.execute(update(CampaignModel).where(CampaignModel.campaign_id == campaign_id).values(**values))
+        s.commit()
+
+
+def run_campaign(
+    campaign_id: str,
+    concurrency: int = CAMPAIGN_CONCURRENCY,
+    caller: Optional[Caller] = None,
+) -> Dict[str, Any]:
+    """대기열이 빌 때까지 최대 concurrency 건을 동시에 통화한다."""
+    with SessionLocal() as s:
+        if s.get(CampaignModel, campaign_id) is None:
+            raise KeyError(f"campaign not found: {campaign_id}")
+
+    caller = caller or partial(simulated_call, callee=SimulatedCallee())
+    _requeue_stale(campaign_id)
+    _set_campaign(campaign_id, status="running", started_at_utc=_now_iso())
+
+    inflight: Dict[Future, int] = {}
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="campaign") as pool:
+        while True:
+            while len(inflight) < concurrency:
+                task = _claim_next(campaign_id)
+                if task is None:
+                    break
+                inflight[pool.submit(_run_task, campaign_id, *task, caller)] = task[0]
+            # 빈 자리가 있으면 백오프 중인 작업이 풀리는 시각까지만 기다린다
+            delay = _next_retry_delay(campaign_id) if len(inflight) < concurrency else None
+            if not inflight:
+                if delay is None:
+                    # 결과 기록에 실패해 running 으로 남은 작업이 있으면 다시 돌린다
+                    if _requeue_stale(campaign_id):
+                        continue
+                    break
+                time.sleep(delay)
+                continue
+            # 실패한 작업이 재대기열에 들어올 수 있으므로 하나 끝날 때마다 다시 채운다
+            done, _ = wait(inflight, timeout=delay, return_when=FIRST_COMPLETED)
+            for fut in done:
+                task_id = inflight.pop(fut)
+                exc = fut.exception()
+                if exc is not None:
+                    logger.error("task %s failed outside the call", task_id, exc_info=exc)
+                    _release_task(task_id, exc)
+
+    _set_campaign(campaign_id, status="done", finished_at_utc=_now_iso())
+    return campaign_stats(campaign_id)
+
+
+def campaign_stats(campaign_id: str) -> Dict[str, Any]:
+    with SessionLocal() as s:
+        c = s.get(CampaignModel, campaign_id)
+        if c is None:
+            raise KeyError(f"campaign not found: {campaign_id}")
+        counts = dict(
+            s.execute(
+                select(TaskModel.status, func.count())
+                .where(TaskModel.campaign_id == campaign_id)
+                .group_by(TaskModel.status)
+            ).all()
+        )
+        first, last = s.execute(
+            select(func.min(TaskModel.started_at_utc), func.max(TaskModel.finished_at_utc))
+            .where(TaskModel.campaign_id == campaign_id)
+        ).one()
+
+    completed = counts.get("done", 0) + counts.get("no_answer", 0)
+    elapsed = 0.0
+    if first and last:
+        elapsed = (datetime.fromisoformat(last) - datetime.fromisoformat(first)).total_seconds()
+
+    return {
+        "campaign_id": c.campaign_id,
+        "name": c.name,
+        "status": c.status,
+        "tasks": counts,
+        "elapsed_sec": round(elapsed, 2),
+        "calls_per_min": round(completed / elapsed * 60.0, 2) if elapsed > 0 else 0.0,
+        "api_requests": {
+            "stt": c.stt_requests or 0,
+            "chat": c.chat_requests or 0,
+            "tts": c.tts_requests or 0,
+        },
+    }
+
+
+# --- CLI ---
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from .db import init_db
+
+    parser = argparse.ArgumentParser(prog="python -m app.scheduler")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_plan = sub.add_parser("plan", help="회원별 발신 작업 생성")
+    p_plan.add_argument("--name", default="daily")
+    p_plan.add_argument("--min-gap-hours", type=float, default=20.0)
+
+    p_run = sub.add_parser("run", help="대기열 실행")
+    p_run.add_argument("campaign_id")
+    p_run.add_argument("--concurrency", type=int, default=CAMPAIGN_CONCURRENCY)
+    p_run.add_argument("--answer-rate", type=float, default=0.9)
+    for kind in ("stt", "chat", "tts"):
+        p_run.add_argument(f"--rpm-{kind}", type=float, default=None)
+
+    p_status = sub.add_parser("status", help="진행 상황 / 처리량")
+    p_status.add_argument("campaign_id")
+
+    args = parser.parse_args(argv)
+    init_db()
+
+    if args.cmd == "plan":
+        result = plan_campaign(args.name, min_gap_hours=args.min_gap_hours)
+    elif args.cmd == "run":
+        limits = {k: getattr(args, f"rpm_{k}") for k in ("stt", "chat", "tts")}
+        quota.configure(**{k: v for k, v in limits.items() if v is not None})
+        caller = partial(simulated_call, callee=SimulatedCallee(answer_rate=args.answer_rate))
+        result = run_campaign(args.campaign_id, concurrency=args.concurrency, caller=caller)
+    else:
+        result = campaign_stats(args.campaign_id)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
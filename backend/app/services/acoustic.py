@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+import re
+import shutil
+import subprocess
+import threading
+import wave
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+# 분석 설정
+TARGET_SR = 16000
+FRAME_SEC = 0.040          # 피치 하한(75Hz) 주기의 2배 이상
+HOP_SEC = 0.010
+MIN_PAUSE_SEC = 0.25       # 이보다 짧은 무음은 휴지로 보지 않음
+F0_MIN, F0_MAX = 75.0, 400.0
+VOICING_THRESHOLD = 0.3    # 정규화 자기상관 피크
+BLOCK_FRAMES = 2048        # 한 번에 처리할 프레임 수 (긴 클립도 메모리 사용량이 일정하도록)
+
+# API 워커(uvicorn 프로세스)마다 풀이 하나씩 생기므로 기본은 작게
+ACOUSTIC_WORKERS = int(os.getenv("ACOUSTIC_WORKERS", str(min(2, os.cpu_count() or 1))))
+ACOUSTIC_TIMEOUT_SEC = float(os.getenv("ACOUSTIC_TIMEOUT_SEC", "20"))
+
+_HANGUL_RE = re.compile(r"[가-힣]")
+
+
+class AcousticUnavailable(Exception):
+    pass
+
+
+# --- DECODE ---
+
+def _read_wav(p: Path) -> Tuple[np.ndarray, int]:
+    with wave.open(str(p), "rb") as w:
+        sr = w.getframerate()
+        ch = w.getnchannels()
+        width = w.getsampwidth()
+        raw = w.readframes(w.getnframes())
+
+    # 변환은 제자리 연산으로 (최대 업로드 크기에서도 사본을 여러 벌 만들지 않도록)
+    if width == 2:
+        x = np.frombuffer(raw, dtype="<i2").astype(np.float32)
+        x /= 32768.0
+    elif width == 4:
+        x = np.frombuffer(raw, dtype="<i4").astype(np.float32)
+        x /= 2147483648.0
+    elif width == 1:
+        x = np.frombuffer(raw, dtype=np.uint8).astype(np.float32)
+        x -= 128.0
+        x /= 128.0
+    else:
+        raise AcousticUnavailable(f"unsupported wav sample width: {width}")
+    del raw
+
+    if ch > 1:
+        x = x[: len(x) - len(x) % ch].reshape(-1, ch).mean(axis=1, dtype=np.float32)
+    return _resample(x, sr)
+
+
+def _resample(x: np.ndarray, sr: int) -> Tuple[np.ndarray, int]:
+    """
+    TARGET_SR 로 변환. 이동 평균 저역 통과 + 정수배는 솎아내기, 그 외는 선형 보간.
+    에너지/휴지/피치(400Hz 이하) 특징에는 이 정도로 충분하다.
+    """
+    if sr == TARGET_SR or x.size == 0:
+        return x, sr
+    ratio = sr / TARGET_SR
+    k = int(round(ratio))
+    if k > 1:
+        x = np.convolve(x, np.full(k, 1.0 / k, dtype=np.float32), mode="same")
+        if abs(ratio - k) < 1e-9:
+            return np.ascontiguousarray(x[::k]), TARGET_SR
+
+    pos = np.arange(int(len(x) / ratio), dtype=np.float64) * ratio
+    i = np.minimum(pos.astype(np.int64), len(x) - 2) if len(x) > 1 else np.zeros(len(pos), dtype=np.int64)
+    frac = (pos - i).astype(np.float32)
+    del pos
+    nxt = x[np.minimum(i + 1, len(x) - 1)]
+    y = x[i]
+    y += (nxt - y) * frac
+    return y, TARGET_SR
+
+
+def _read_ffmpeg(p: Path) -> Tuple[np.ndarray, int]:
+    # webm/opus 등 브라우저 녹음 포맷은 ffmpeg 로 mono 16k PCM 변환
+    if shutil.which("ffmpeg") is None:
+        raise AcousticUnavailable("ffmpeg not installed")
+    proc = subprocess.run(
+        ["ffmpeg", "-v", "error", "-i", str(p), "-f", "s16le", "-ac", "1", "-ar", str(TARGET_SR), "-"],
+        capture_output=True,
+        timeout=ACOUSTIC_TIMEOUT_SEC,
+    )
+    if proc.returncode != 0:
+        raise AcousticUnavailable("ffmpeg decode failed")
+    return np.frombuffer(proc.stdout, dtype="<i2").astype(np.float32) / 32768.0, TARGET_SR
+
+
+def decode_audio(file_path: str | Path) -> Tuple[np.ndarray, int]:
+    p = Path(file_path)
+    if p.suffix.lower() == ".wav":
+        try:
+            return _read_wav(p)
+        except wave.Error:
+            pass
+    return _read_ffmpeg(p)
+
+
+# --- FEATURES ---
+
+def extract_features(x: np.ndarray, sr: int) -> Dict[str, Any]:
+    """
+    프레임 단위 에너지/피치를 벡터 연산으로 계산.
+    발화 속도는 전사 텍스트가 필요하므로 add_speech_rate() 에서 따로 붙인다.
+    """
+    win = int(FRAME_SEC * sr)
+    hop = int(HOP_SEC * sr)
+    duration = len(x) / sr if sr else 0.0
+    if len(x) < win:
+        return {"not_evaluated": True, "reason": "clip too short", "duration_sec": round(duration, 3)}
+
+    # 프레임 행렬은 view 로만 만들고, 실제 계산은 BLOCK_FRAMES 씩 나눠서 한다
+    frames = np.lib.stride_tricks.sliding_window_view(x, win)[::hop]
+    n_frames = frames.shape[0]
+
+    def blocks():
+        for i in range(0, n_frames, BLOCK_FRAMES):
+            b = frames[i : i + BLOCK_FRAMES]
+            yield i, b - b.mean(axis=1, keepdims=True)
+
+    # 에너지 (dB) 와 적응형 음성 구간 판정
+    rms = np.empty(n_frames)
+    for i, b in blocks():
+        rms[i : i + len(b)] = np.sqrt(np.mean(b * b, axis=1))
+    db = 20.0 * np.log10(np.maximum(rms, 1e-5))  # 디지털 무음은 -100dB 로 클램프
+    thr = max(np.percentile(db, 10) + 12.0, db.max() - 40.0)
+    speech = db > thr
+
+    idx = np.flatnonzero(speech)
+    if idx.size == 0:
+        return {"not_evaluated": True, "reason": "no speech detected", "duration_sec": round(duration, 3)}
+
+    # 휴지: 첫 발화 ~ 마지막 발화 사이의 무음 구간
+    seg = speech[idx[0] : idx[-1] + 1].astype(np.int8)
+    edges = np.diff(np.concatenate(([1], seg, [1])))
+    gap_len = (np.flatnonzero(edges == 1) - np.flatnonzero(edges == -1)) * HOP_SEC
+    pauses = gap_len[gap_len >= MIN_PAUSE_SEC]
+    span = seg.size * HOP_SEC
+    pause_total = float(pauses.sum())
+
+    # 피치: 유성 프레임의 FFT 자기상관 (블록 단위)
+    window = np.hanning(win)
+    lo = int(sr / F0_MAX)
+    hi = min(int(sr / F0_MIN), win - 1)
+    f0_parts = []
+    for i, b in blocks():
+        sel = speech[i : i + len(b)]
+        if not sel.any():
+            continue
+        spec = np.fft.rfft(b[sel] * window, n=2 * win, axis=1)
+        ac = np.fft.irfft(spec.real ** 2 + spec.imag ** 2, axis=1)[:, :win]
+        ac = ac / np.maximum(ac[:, :1], 1e-12)
+        band = ac[:, lo : hi + 1]
+        lag = band.argmax(axis=1) + lo
+        voiced = band.max(axis=1) > VOICING_THRESHOLD
+        f0_parts.append(sr / lag[voiced])
+    f0 = np.concatenate(f0_parts) if f0_parts else np.empty(0)
+
+    pitch: Dict[str, Any] = {"voiced_frames": int(f0.size)}
+    if f0.size >= 2:
+        semis = 12.0 * np.log2(f0 / np.median(f0))
+        pitch.update(
+            {
+                "f0_median_hz": round(float(np.median(f0)), 1),
+                "f0_std_semitones": round(float(semis.std()), 3),
+                "f0_range_semitones": round(float(np.percentile(semis, 95) - np.percentile(semis, 5)), 3),
+            }
+        )
+
+    speech_db = db[speech]
+    return {
+        "duration_sec": round(duration, 3),
+        "speech_span_sec": round(span, 3),
+        "voiced_sec": round(span - pause_total, 3),
+        "pause_count": int(pauses.size),
+        "pause_ratio": round(pause_total / span, 4) if span else 0.0,
+        "mean_pause_sec": round(float(pauses.mean()), 3) if pauses.size else 0.0,
+        "pitch": pitch,
+        "energy": {
+            "mean_db": round(float(speech_db.mean()), 2),
+            "std_db": round(float(speech_db.std()), 2),
+            "dynamic_range_db": round(float(np.percentile(db, 95) - np.percentile(db, 5)), 2),
+        },
+    }
+
+
+def add_speech_rate(features: Dict[str, Any], transcript: str) -> Dict[str, Any]:
+    """음절 수(한글 글자 수, 없으면 어절 수) 기준 발화 속도"""
+    if features.get("not_evaluated") or not transcript:
+        return features
+    units = len(_HANGUL_RE.findall(transcript)) or len(transcript.split())
+    span = features.get("speech_span_sec") or 0.0
+    voiced = features.get("voiced_sec") or 0.0
+    features["syllables"] = units
+    features["speech_rate_sps"] = round(units / span, 3) if span else 0.0
+    features["articulation_rate_sps"] = round(units / voiced, 3) if voiced else 0.0
+    return features
+
+
+def analyze_clip(file_path: str) -> Dict[str, Any]:
+    """프로세스 풀에서 실행되는 진입점 (picklable 한 인자/반환값만 사용)"""
+    try:
+        x, sr = decode_audio(file_path)
+    except (AcousticUnavailable, OSError, subprocess.TimeoutExpired) as e:
+        return {"not_evaluated": True, "reason": str(e) or "decode failed"}
+    return extract_features(x, sr)
+
+
+# --- PROCESS POOL ---
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # 서버 프로세스는 스레드가 많으므로 fork 대신 spawn
+            _pool = ProcessPoolExecutor(max_workers=ACOUSTIC_WORKERS, mp_context=mp.get_context("spawn"))
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """워커가 죽어 깨진 풀을 버린다. 다음 get_pool() 에서 새로 만든다."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _unavailable(reason: str) -> Future:
+    job: Future = Future()
+    job.set_result({"not_evaluated": True, "reason": reason})
+    return job
+
+
+def submit_analysis(file_path: str | Path) -> Future:
+    """음향 분석은 턴 처리를 실패시키지 않는다. 풀이 깨졌으면 한 번 새로 만들어 재시도."""
+    for _ in range(2):
+        pool = get_pool()
+        try:
+            return pool.submit(analyze_clip, str(file_path))
+        except BrokenProcessPool:
+            _discard_pool(pool)
+        except RuntimeError:
+            # 종료 중인 풀
+            break
+    return _unavailable("analysis pool unavailable")
+
+
+def collect_analysis(job: Future, transcript: str, timeout: Optional[float] = ACOUSTIC_TIMEOUT_SEC) -> Dict[str, Any]:
+    try:
+        features = job.result(timeout=timeout)
+    except Exception as e:
+        job.cancel()
+        return {"not_evaluated": True, "reason": f"analysis failed: {type(e).__name__}"}
+    return add_speech_rate(features, transcript)
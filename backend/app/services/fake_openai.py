@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import io
+import json
+import time
+import wave
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+# OPENAI_FAKE=1 일 때 get_client() 가 돌려주는 가짜 백엔드.
+# 네트워크 없이 통화 흐름/캠페인 처리량을 시험하기 위한 것 (OPENAI_FAKE_LATENCY 초 만큼 지연)
+
+_REPLIES = [
+    "할머니, 오늘 식사는 잘 하셨어요?",
+    "요즘 잠은 잘 주무세요?",
+    "산책은 좀 다녀오셨어요?",
+]
+
+_FAKE_EVAL = {
+    "semantic_impairment": {"pronoun_overuse": 0, "vagueness": 1, "lexical_poverty": 0, "repetition": 0},
+    "information_impairment": {"missing_core_info": 0, "low_specificity": 1, "inappropriate_reference": 0},
+    "syntactic_impairment": {"verb_reduction": 0, "sentence_fragments": 0, "syntactic_simplification": 0},
+    "risk_probability": 0.1,
+    "rationale": {"summary": "특이사항 없음", "evidence_sentences": []},
+    "final_risk_score": 0.1,
+    "summary_text": "특이사항 없음",
+}
+
+
+def silent_wav(sec: float = 0.5, sr: int = 16000) -> bytes:
+    b = io.BytesIO()
+    with wave.open(b, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(b"\0\0" * int(sec * sr))
+    return b.getvalue()
+
+
+class _Completions:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def create(self, model: str, messages: List[Dict[str, Any]], response_format: Any = None, **kwargs: Any):
+        time.sleep(self.latency)
+        if response_format:
+            content = json.dumps(_FAKE_EVAL, ensure_ascii=False)
+        else:
+            system = messages[0].get("content", "") if messages else ""
+            turns = len(messages) - 1
+            content = _REPLIES[turns % len(_REPLIES)]
+            if "[SYSTEM:" in system:
+                content = "오늘도 건강하세요. 또 전화드릴게요! [END]"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class _Transcriptions:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def create(self, model: str, file: Any, **kwargs: Any):
+        time.sleep(self.latency)
+        return SimpleNamespace(text="응, 잘 지내. 밥도 먹었어.")
+
+
+class _Speech:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def create(self, model: str, voice: str, input: str, **kwargs: Any):
+        time.sleep(self.latency)
+        data = silent_wav()
+        return SimpleNamespace(read=lambda: data)
+
+
+class FakeOpenAI:
+    def __init__(self, latency: float = 0.0):
+        self.chat = SimpleNamespace(completions=_Completions(latency))
+        self.audio = SimpleNamespace(
+            transcriptions=_Transcriptions(latency),
+            speech=_Speech(latency),
+        )
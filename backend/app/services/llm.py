@@ -4,9 +4,8 @@ import json
 import re
 from typing import Any, Dict, List
 
-from openai import OpenAI
-
-client = OpenAI()
+from .openai_client import get_client
+from .quota import acquire
 
 CHAT_MODEL = "gpt-4o-mini"
 EVAL_MODEL = "gpt-4o-mini"
@@ -104,6 +103,9 @@ CHAT_SYSTEM_PROMPT = """
 """.strip()
 
 
+GREETING_TEXT = "안녕하세요! 건강지킴이입니다. 오늘 하루는 어떠셨나요?"
+
+
 def make_assistant_reply(conversation: List[Dict[str, str]]) -> tuple[str, bool]:
     """
     Returns: (reply_text, end_call_flag)
@@ -118,7 +120,8 @@ def make_assistant_reply(conversation: List[Dict[str, str]]) -> tuple[str, bool]
         current_prompt += "\n\n[SYSTEM: 대화가 충분히 길어졌어. 이제 다정하게 작별 인사를 하고 반드시 문장 끝에 [END]를 붙여서 통화를 종료해.]"
 
     # [수정] 올바른 OpenAI 메서드 사용
-    resp = client.chat.completions.create(
+    acquire("chat")
+    resp = get_client().chat.completions.create(
         model=CHAT_MODEL,
         messages=[
             {"role": "system", "content": current_prompt},
@@ -190,7 +193,8 @@ def evaluate_transcript(transcript: str, context: List[Dict[str, str]] | None =
         + EVAL_SCHEMA
     )
 
-    resp = client.chat.completions.create(
+    acquire("chat")
+    resp = get_client().chat.completions.create(
         model=EVAL_MODEL,
         messages=[
             {"role": "system", "content": EVAL_SYSTEM_PROMPT},
@@ -244,7 +248,8 @@ def generate_final_report(conversation: List[Dict[str, str]]) -> Dict[str, Any]:
         + REPORT_SCHEMA
     )
 
-    resp = client.chat.completions.create(
+    acquire("chat")
+    resp = get_client().chat.completions.create(
         model=EVAL_MODEL,
         messages=[
             {"role": "system", "content": REPORT_SYSTEM_PROMPT},
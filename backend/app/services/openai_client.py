@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import os
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+
+@lru_cache(maxsize=1)
+def get_client() -> "OpenAI":
+    """
+    프로세스 전체에서 공유하는 OpenAI 클라이언트.
+    import 시점이 아니라 첫 호출 때 만든다. (openai 패키지 import 도 이때)
+    """
+    if os.getenv("OPENAI_FAKE"):
+        # 네트워크 없이 시험할 때 (services/fake_openai.py)
+        from .fake_openai import FakeOpenAI
+
+        return FakeOpenAI(latency=float(os.getenv("OPENAI_FAKE_LATENCY", "0")))
+
+    from openai import OpenAI
+
+    return OpenAI()
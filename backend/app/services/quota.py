@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from ..db import SessionLocal
+from ..models import ApiQuota
+
+# 분당 요청 한도 (0 이면 제한 없음).
+# 버킷 상태는 DB(api_quotas)에 있으므로 같은 DB 를 쓰는 모든 프로세스(uvicorn 워커, 캠페인 워커)가
+# 하나의 예산을 나눠 쓴다. 한도 값 자체는 프로세스마다 같은 환경변수로 맞춰야 한다.
+RPM_LIMITS: Dict[str, float] = {
+    "stt": float(os.getenv("OPENAI_RPM_STT", "0")),
+    "chat": float(os.getenv("OPENAI_RPM_CHAT", "0")),
+    "tts": float(os.getenv("OPENAI_RPM_TTS", "0")),
+}
+
+# track() 블록 안에서 호출된 API 요청 수 (캠페인별 집계용)
+_tracked: ContextVar[Optional[Counter]] = ContextVar("quota_tracked", default=None)
+
+
+def _capacity(rate_per_sec: float) -> float:
+    # 최대 1초 분량까지 몰아서 허용
+    return max(1.0, rate_per_sec)
+
+
+def _try_take(kind: str, rate_per_sec: float) -> float:
+    """
+    토큰 하나를 가져오면 0, 아니면 다음 토큰까지 기다릴 초를 돌려준다.
+    읽은 값 그대로일 때만 UPDATE 하므로(낙관적 잠금) 다른 프로세스와 동시에 가져가도 초과하지 않는다.
+    """
+    capacity = _capacity(rate_per_sec)
+    with SessionLocal() as s:
+        row = s.execute(select(ApiQuota.tokens, ApiQuota.updated_at).where(ApiQuota.kind == kind)).first()
+        now = time.time()
+        if row is None:
+            s.add(ApiQuota(kind=kind, tokens=capacity - 1.0, updated_at=now))
+            try:
+                s.commit()
+                return 0.0
+            except IntegrityError:
+                return 1e-3  # 다른 프로세스가 먼저 만들었음 -> 바로 재시도
+
+        tokens = min(capacity, row.tokens + max(0.0, now - row.updated_at) * rate_per_sec)
+        if tokens < 1.0:
+            return (1.0 - tokens) / rate_per_sec
+
+        n = s.execute(
+            update(ApiQuota)
+            .where(ApiQuota.kind == kind, ApiQuota.tokens == row.tokens, ApiQuota.updated_at == row.updated_at)
+            .values(tokens=tokens - 1.0, updated_at=now)
+        ).rowcount
+        s.commit()
+        return 0.0 if n == 1 else 1e-3
+
+
+def configure(**rpm: float) -> None:
+    """한도 변경 (CLI/벤치마크용). 예: configure(chat=500, tts=100)"""
+    RPM_LIMITS.update({k: float(v) for k, v in rpm.items()})
+
+
+def acquire(kind: str) -> None:
+    """API 호출 직전에 부른다. 예산이 없으면 토큰이 찰 때까지 대기."""
+    rpm = RPM_LIMITS.get(kind, 0.0)
+    if rpm > 0:
+        rate = rpm / 60.0
+        while True:
+            wait = _try_take(kind, rate)
+            if wait <= 0:
+                break
+            time.sleep(wait)
+
+    counts = _tracked.get()
+    if counts is not None:
+        counts[kind] += 1
+
+
+@contextmanager
+def track() -> Iterator[Counter]:
+    """블록 안(같은 스레드/컨텍스트)에서 acquire 된 요청 수를 종류별로 센다."""
+    counts: Counter = Counter()
+    token = _tracked.set(counts)
+    try:
+        yield counts
+    finally:
+        _tracked.reset(token)
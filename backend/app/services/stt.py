@@ -2,9 +2,8 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from openai import OpenAI
-
-client = OpenAI()
+from .openai_client import get_client
+from .quota import acquire
 
 TRANSCRIBE_MODEL = "gpt-4o-mini-transcribe"
 
@@ -15,7 +14,8 @@ def transcribe_audio(file_path: str | Path) -> str:
         return ""
 
     with p.open("rb") as f:
-        result = client.audio.transcriptions.create(
+        acquire("stt")
+        result = get_client().audio.transcriptions.create(
             model=TRANSCRIBE_MODEL,
             file=f,
         )
@@ -2,9 +2,8 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from openai import OpenAI
-
-client = OpenAI()
+from .openai_client import get_client
+from .quota import acquire
 
 # [중요] 속도가 가장 빠른 tts-1 모델로 변경
 TTS_MODEL = "tts-1"
@@ -23,7 +22,8 @@ def synthesize_speech_to_wav(text: str, out_path: str | Path) -> str:
     out = Path(out_path)
     out.parent.mkdir(parents=True, exist_ok=True)
 
-    audio = client.audio.speech.create(
+    acquire("tts")
+    audio = get_client().audio.speech.create(
         model=TTS_MODEL,
         voice=TTS_VOICE,
         input=text,
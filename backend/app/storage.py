@@ -1,18 +1,501 @@
 # backend/app/storage.py
+"""
+오디오 저장소
+
+레이아웃:
+  storage/audio/{h[0:2]}/{h[2:4]}/{session_id}_{speaker}_{uuid}.{ext}   (hot)
+  storage/archive/{h[0:2]}/{session_id}.zip                              (archive)
+  h = sha1(session_id)
+
+한 세션의 파일은 같은 shard 디렉토리에 모인다.
+예전 flat 레이아웃(storage/audio/{파일명})은 읽기만 지원하고 `migrate` 로 옮긴다.
+retention 은 처리한 세션에 sessions.audio_tier 를 기록해 다음 실행에서 다시 보지 않는다.
+
+CLI (backend 디렉토리에서):
+  python -m app.storage migrate
+  python -m app.storage retention [--archive-days N] [--delete-days N]
+  python -m app.storage gc [--grace SEC] [--dry-run]
+"""
 from __future__ import annotations
 
+import argparse
+import hashlib
+import os
+import re
+import time
+import zipfile
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
 from uuid import uuid4
 
-STORAGE_DIR = Path("./storage")
+from sqlalchemy import func, or_, select, tuple_, update
+from sqlalchemy.orm import Session as DBSession
+
+from .db import STORAGE_DIR
+from .models import Session as SessionModel, Turn as TurnModel
+
 AUDIO_DIR = STORAGE_DIR / "audio"
+ARCHIVE_DIR = STORAGE_DIR / "archive"
+
+# 업로드 스트리밍 설정 (OpenAI 전사 API 파일 한도 25MB 기준)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(25 * 1024 * 1024)))
+
+# 보존 정책 (세션 시작 시각 기준, 0 이면 비활성)
+AUDIO_ARCHIVE_DAYS = int(os.getenv("AUDIO_ARCHIVE_DAYS", "0"))
+AUDIO_RETENTION_DAYS = int(os.getenv("AUDIO_RETENTION_DAYS", "0"))
+
+# GC: 이 시간보다 최근 파일은 진행 중인 요청일 수 있으므로 건드리지 않음
+GC_GRACE_SECONDS = int(os.getenv("AUDIO_GC_GRACE_SECONDS", "3600"))
+
+_AUDIO_NAME_RE = re.compile(r"^([0-9A-Za-z]+)_(user|assistant)_[0-9a-f]{32}(\.[0-9A-Za-z]+)?$")
+_PART_SUFFIX = ".part"
+# save_stream 이 만드는 임시 파일: .{오디오 파일명}.{uuid hex}.part
+_PART_NAME_RE = re.compile(r"^\.(.+)\.[0-9a-f]{32}\.part$")
+_BATCH = 1000
+
+
+class UploadTooLarge(Exception):
+    pass
 
 
 def ensure_dirs():
     AUDIO_DIR.mkdir(parents=True, exist_ok=True)
 
 
+# --- LAYOUT ---
+
+def _shard_key(session_id: str) -> str:
+    return hashlib.sha1(session_id.encode("utf-8")).hexdigest()
+
+
+def shard_dir(session_id: str) -> Path:
+    h = _shard_key(session_id)
+    return AUDIO_DIR / h[:2] / h[2:4]
+
+
+def archive_path(session_id: str) -> Path:
+    return ARCHIVE_DIR / _shard_key(session_id)[:2] / f"{session_id}.zip"
+
+
+def parse_audio_name(filename: str) -> Optional[str]:
+    """파일명이 저장소 규칙에 맞으면 session_id, 아니면 None"""
+    m = _AUDIO_NAME_RE.match(filename)
+    return m.group(1) if m else None
+
+
+def audio_path_for(filename: str) -> Path:
+    session_id = parse_audio_name(filename)
+    if session_id is None:
+        raise ValueError(f"invalid audio filename: {filename}")
+    return shard_dir(session_id) / filename
+
+
 def new_audio_path(session_id: str, speaker: str, ext: str = "wav") -> Path:
-    ensure_dirs()
+    ext = ext.lstrip(".") or "wav"
+    d = shard_dir(session_id)
+    d.mkdir(parents=True, exist_ok=True)
     fname = f"{session_id}_{speaker}_{uuid4().hex}.{ext}"
-    return AUDIO_DIR / fname
\ No newline at end of file
+    return d / fname
+
+
+AudioLocation = Union[Path, Tuple[Path, str]]
+
+
+def locate_audio(filename: str) -> Optional[AudioLocation]:
+    """
+    hot shard -> 예전 flat 위치 -> 세션 archive 순서로 찾는다.
+    Returns: 파일 Path, (zip Path, member 이름), 또는 None
+    """
+    session_id = parse_audio_name(filename)
+    if session_id is None:
+        return None
+
+    p = shard_dir(session_id) / filename
+    if p.exists():
+        return p
+    legacy = AUDIO_DIR / filename
+    if legacy.exists():
+        return legacy
+    z = archive_path(session_id)
+    if z.exists() and filename in _archive_members(z):
+        return (z, filename)
+    return None
+
+
+def read_audio(loc: AudioLocation) -> bytes:
+    if isinstance(loc, Path):
+        return loc.read_bytes()
+    z, member = loc
+    with zipfile.ZipFile(z) as zf:
+        return zf.read(member)
+
+
+def _archive_members(z: Path) -> List[str]:
+    with zipfile.ZipFile(z) as zf:
+        return zf.namelist()
+
+
+def _session_hot_files(session_id: str) -> List[Path]:
+    files = list(shard_dir(session_id).glob(f"{session_id}_*"))
+    files += list(AUDIO_DIR.glob(f"{session_id}_*"))
+    return [p for p in files if p.is_file() and not p.name.endswith(_PART_SUFFIX)]
+
+
+def iter_audio_files() -> Iterator[Path]:
+    """shard 디렉토리와 예전 flat 위치의 모든 파일 (임시 .part 포함)"""
+    if not AUDIO_DIR.exists():
+        return
+    for entry in os.scandir(AUDIO_DIR):
+        if entry.is_file():
+            yield Path(entry.path)
+        elif entry.is_dir():
+            for sub in os.scandir(entry.path):
+                if sub.is_dir():
+                    for f in os.scandir(sub.path):
+                        if f.is_file():
+                            yield Path(f.path)
+
+
+# --- WRITE ---
+
+def save_stream(
+    src: BinaryIO,
+    out_path: Path,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> Tuple[int, str]:
+    """
+    src 를 chunk 단위로 out_path 에 기록한다. (전체를 메모리에 올리지 않음)
+    임시 파일에 쓰면서 sha256 을 계산하고, 끝나면 rename 으로 원자적으로 교체한다.
+    max_bytes 를 넘으면 즉시 중단하고 UploadTooLarge 를 던진다.
+    Returns: (size_bytes, sha256_hex)
+    """
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_name(f".{out_path.name}.{uuid4().hex}{_PART_SUFFIX}")
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with tmp_path.open("wb") as f:
+            while True:
+                chunk = src.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"upload exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    return size, digest.hexdigest()
+
+
+# --- MIGRATION ---
+
+def _iter_turn_paths(s: DBSession) -> Iterator[List[Tuple[int, str]]]:
+    """(id, audio_path) 를 id 순서로 배치 단위 조회 (keyset pagination)"""
+    last_id = 0
+    while True:
+        q = (
+            select(TurnModel.id, TurnModel.audio_path)
+            .where(TurnModel.id > last_id, TurnModel.audio_path.is_not(None))
+            .order_by(TurnModel.id.asc())
+            .limit(_BATCH)
+        )
+        rows = [(int(i), p) for i, p in s.execute(q).all()]
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def migrate_flat_layout(s: DBSession) -> Dict[str, int]:
+    """flat 레이아웃의 파일을 shard 로 옮기고 Turn.audio_path 를 갱신 (재실행 안전)"""
+    moved = 0
+    if AUDIO_DIR.exists():
+        for entry in os.scandir(AUDIO_DIR):
+            if not entry.is_file() or parse_audio_name(entry.name) is None:
+                continue
+            dst = audio_path_for(entry.name)
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(entry.path, dst)
+            moved += 1
+
+    updated = 0
+    for rows in _iter_turn_paths(s):
+        for turn_id, p in rows:
+            name = Path(p).name
+            if parse_audio_name(name) is None:
+                continue
+            new = str(audio_path_for(name))
+            if new != p:
+                s.execute(update(TurnModel).where(TurnModel.id == turn_id).values(audio_path=new))
+                updated += 1
+        s.commit()
+
+    return {"moved": moved, "updated": updated}
+
+
+# --- RETENTION / TIERING ---
+
+def _cutoff_iso(days: int, now: datetime) -> str:
+    return (now - timedelta(days=days)).isoformat()
+
+
+def _iter_sessions_before(s: DBSession, cutoff: str, tiers: Tuple[Optional[str], ...]) -> Iterator[List[str]]:
+    """
+    cutoff 이전에 시작했고 audio_tier 가 tiers 중 하나인 세션을 배치 단위로 조회 (keyset pagination).
+    이미 처리한 세션은 audio_tier 가 바뀌어 제외되므로 매일 도는 비용이 전체 이력에 비례하지 않는다.
+    """
+    cond = [SessionModel.audio_tier.in_([t for t in tiers if t is not None])]
+    if None in tiers:
+        cond.append(SessionModel.audio_tier.is_(None))
+    last: Optional[Tuple[str, str]] = None
+    while True:
+        q = (
+            select(SessionModel.started_at_utc, SessionModel.session_id)
+            .where(SessionModel.started_at_utc < cutoff, or_(*cond))
+            .order_by(SessionModel.started_at_utc.asc(), SessionModel.session_id.asc())
+            .limit(_BATCH)
+        )
+        if last is not None:
+            q = q.where(tuple_(SessionModel.started_at_utc, SessionModel.session_id) > last)
+        rows = s.execute(q).all()
+        if not rows:
+            return
+        yield [sid for _, sid in rows]
+        last = (rows[-1][0], rows[-1][1])
+
+
+def archive_session(session_id: str) -> int:
+    """세션의 hot 파일을 zip 하나로 묶고 원본을 지운다. (오디오는 이미 압축 포맷이라 STORED)"""
+    files = _session_hot_files(session_id)
+    if not files:
+        return 0
+
+    z = archive_path(session_id)
+    z.parent.mkdir(parents=True, exist_ok=True)
+    existing = _archive_members(z) if z.exists() else []
+
+    tmp = z.with_name(f".{z.name}.{uuid4().hex}{_PART_SUFFIX}")
+    try:
+        with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_STORED) as out:
+            if existing:
+                with zipfile.ZipFile(z) as old:
+                    for name in existing:
+                        out.writestr(old.getinfo(name), old.read(name))
+            for f in files:
+                if f.name not in existing:
+                    out.write(f, arcname=f.name)
+        os.replace(tmp, z)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    for f in files:
+        f.unlink(missing_ok=True)
+    return len(files)
+
+
+def delete_session_audio(s: DBSession, session_id: str) -> int:
+    """세션의 오디오(hot + archive)를 삭제하고 Turn.audio_path 를 비운다. 전사 텍스트는 유지."""
+    removed = 0
+    for f in _session_hot_files(session_id):
+        f.unlink(missing_ok=True)
+        removed += 1
+    z = archive_path(session_id)
+    if z.exists():
+        removed += len(_archive_members(z))
+        z.unlink()
+
+    s.execute(
+        update(TurnModel)
+        .where(TurnModel.session_id == session_id, TurnModel.audio_path.is_not(None))
+        .values(audio_path=None)
+    )
+    return removed
+
+
+def _set_audio_tier(s: DBSession, session_ids: List[str], tier: str) -> None:
+    s.execute(update(SessionModel).where(SessionModel.session_id.in_(session_ids)).values(audio_tier=tier))
+
+
+def apply_retention(
+    s: DBSession,
+    archive_days: int = AUDIO_ARCHIVE_DAYS,
+    delete_days: int = AUDIO_RETENTION_DAYS,
+    now: Optional[datetime] = None,
+) -> Dict[str, int]:
+    now = now or datetime.now(timezone.utc)
+    stats = {"archived_sessions": 0, "archived_files": 0, "deleted_sessions": 0, "deleted_files": 0}
+
+    if delete_days > 0:
+        for sids in _iter_sessions_before(s, _cutoff_iso(delete_days, now), (None, "archived")):
+            for sid in sids:
+                n = delete_session_audio(s, sid)
+                if n:
+                    stats["deleted_sessions"] += 1
+                    stats["deleted_files"] += n
+            _set_audio_tier(s, sids, "deleted")
+            s.commit()
+
+    if archive_days > 0:
+        for sids in _iter_sessions_before(s, _cutoff_iso(archive_days, now), (None,)):
+            for sid in sids:
+                n = archive_session(sid)
+                if n:
+                    stats["archived_sessions"] += 1
+                    stats["archived_files"] += n
+            _set_audio_tier(s, sids, "archived")
+            s.commit()
+
+    return stats
+
+
+# --- GC ---
+
+_GC_FILE_BATCH = 400  # 파일당 경로 후보 2개 -> IN 파라미터 800개 (구버전 SQLite 한도 999 이내)
+
+
+def _is_temp_upload(name: str) -> bool:
+    m = _PART_NAME_RE.match(name)
+    return m is not None and parse_audio_name(m.group(1)) is not None
+
+
+def _candidate_paths(f: Path) -> List[str]:
+    """파일을 가리킬 수 있는 audio_path 값들 (현재 위치 + migrate 전후 위치)"""
+    paths = {str(f)}
+    session_id = parse_audio_name(f.name)
+    if session_id is not None:
+        paths.add(str(shard_dir(session_id) / f.name))
+        paths.add(str(AUDIO_DIR / f.name))
+    return list(paths)
+
+
+def _delete_unreferenced(s: DBSession, files: List[Path], dry_run: bool) -> int:
+    by_path: Dict[str, Path] = {}
+    for f in files:
+        for p in _candidate_paths(f):
+            by_path[p] = f
+    q = select(TurnModel.audio_path).where(TurnModel.audio_path.in_(list(by_path)))
+    referenced = {by_path[p] for p in s.execute(q).scalars()}
+
+    n = 0
+    for f in files:
+        if f in referenced:
+            continue
+        n += 1
+        if not dry_run:
+            f.unlink(missing_ok=True)
+    return n
+
+
+def gc_orphans(s: DBSession, grace_seconds: int = GC_GRACE_SECONDS, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Turn.audio_path 와 디스크를 맞춘다.
+    - 어떤 Turn 도 참조하지 않는 오디오 파일, 남은 .part 임시 파일 삭제 (grace 기간 이후만)
+      저장소 파일명 규칙(_AUDIO_NAME_RE)에 맞지 않는 파일은 건드리지 않는다
+    - 파일이 어디에도 없는 Turn.audio_path 는 NULL 로 정리
+    - 현재 저장소 밖을 가리키는 참조(foreign_refs)가 있으면 migrate 전까지 고아 파일은 지우지 않음
+    파일은 배치 단위로 audio_path 인덱스에 조회하므로 메모리 사용량은 파일 수와 무관하다.
+    """
+    stats = {"orphan_files": 0, "stale_parts": 0, "dangling_refs": 0, "foreign_refs": 0}
+
+    for rows in _iter_turn_paths(s):
+        archive_cache: Dict[str, List[str]] = {}
+        for turn_id, p in rows:
+            name = Path(p).name
+            sid = parse_audio_name(name)
+            if sid is None:
+                if Path(p).exists():
+                    continue
+            elif (shard_dir(sid) / name).exists() or (AUDIO_DIR / name).exists():
+                continue
+            else:
+                if sid not in archive_cache:
+                    z = archive_path(sid)
+                    archive_cache[sid] = _archive_members(z) if z.exists() else []
+                if name in archive_cache[sid]:
+                    continue
+            stats["dangling_refs"] += 1
+            if not dry_run:
+                s.execute(update(TurnModel).where(TurnModel.id == turn_id).values(audio_path=None))
+        if not dry_run:
+            s.commit()
+
+    # 저장소 경로가 바뀐 뒤 migrate 전이라면 모든 파일이 고아로 보이므로 삭제하지 않는다
+    # (끊어진 참조는 위에서 이미 정리됨)
+    stats["foreign_refs"] = s.execute(
+        select(func.count())
+        .select_from(TurnModel)
+        .where(TurnModel.audio_path.is_not(None), TurnModel.audio_path.not_like(f"{AUDIO_DIR}%"))
+    ).scalar_one()
+    delete_orphans = stats["foreign_refs"] == 0
+
+    cutoff = time.time() - grace_seconds
+    batch: List[Path] = []
+    for f in iter_audio_files():
+        is_part = _is_temp_upload(f.name)
+        if not is_part and parse_audio_name(f.name) is None:
+            continue
+        try:
+            if f.stat().st_mtime >= cutoff:
+                continue
+        except FileNotFoundError:
+            continue
+        if is_part:
+            stats["stale_parts"] += 1
+            if not dry_run:
+                f.unlink(missing_ok=True)
+        elif delete_orphans:
+            batch.append(f)
+            if len(batch) >= _GC_FILE_BATCH:
+                stats["orphan_files"] += _delete_unreferenced(s, batch, dry_run)
+                batch = []
+    if batch:
+        stats["orphan_files"] += _delete_unreferenced(s, batch, dry_run)
+
+    return stats
+
+
+# --- CLI ---
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from .db import SessionLocal, init_db
+
+    parser = argparse.ArgumentParser(prog="python -m app.storage")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("migrate", help="flat 레이아웃 -> shard 레이아웃")
+
+    p_ret = sub.add_parser("retention", help="보존 정책 적용 (archive / delete)")
+    p_ret.add_argument("--archive-days", type=int, default=AUDIO_ARCHIVE_DAYS)
+    p_ret.add_argument("--delete-days", type=int, default=AUDIO_RETENTION_DAYS)
+
+    p_gc = sub.add_parser("gc", help="고아 파일 / 끊어진 참조 정리")
+    p_gc.add_argument("--grace", type=int, default=GC_GRACE_SECONDS)
+    p_gc.add_argument("--dry-run", action="store_true")
+
+    args = parser.parse_args(argv)
+    init_db()
+
+    with SessionLocal() as s:
+        if args.cmd == "migrate":
+            stats = migrate_flat_layout(s)
+        elif args.cmd == "retention":
+            stats = apply_retention(s, archive_days=args.archive_days, delete_days=args.delete_days)
+        else:
+            stats = gc_orphans(s, grace_seconds=args.grace, dry_run=args.dry_run)
+    print(stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# backend/app/turns.py
+"""
+통화 턴 기록 (웹 API 와 캠페인 스케줄러가 공유)
+
+- record_assistant_turn: 대화 맥락으로 다음 발화 생성 -> TTS -> 턴 저장
+- record_user_turn     : 음성 저장 -> (음향 분석 || STT -> LLM 평가) -> 턴 저장
+- finalize_session     : 최종 리포트 생성/저장
+- dump_user_meta / split_user_meta: 사용자 턴 meta_json 레이아웃 (export.py 와 공유)
+
+세션 존재 여부, 요청 값 검증은 호출하는 쪽에서 한다.
+"""
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session as DBSession
+
+from .models import Session as SessionModel, Turn as TurnModel
+from .services.acoustic import collect_analysis, submit_analysis
+from .services.llm import GREETING_TEXT, evaluate_transcript, generate_final_report, make_assistant_reply
+from .services.stt import transcribe_audio
+from .services.tts import synthesize_speech_to_wav
+from .storage import new_audio_path, save_stream
+
+FALLBACK_REPLY = "응? 다시 말해줄래?"
+TRANSCRIPT_FAILED = "(전사 실패)"
+
+# 사용자 턴 meta_json 레이아웃.
+# export.py 는 평가 JSON 을 다시 파싱하지 않고 원문을 잘라 쓰므로(split_user_meta),
+# 저장은 항상 dump_user_meta 로 하고 평가 뒤에는 숫자/해시 필드만 둔다.
+_META_EVAL_PREFIX = '{"llm_evaluation": '
+_META_RISK_SEP = ', "risk_prob": '
+_JSON_NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def dump_user_meta(llm_eval: Dict[str, Any], risk_prob: float, audio_bytes: int, audio_sha256: str) -> str:
+    return (
+        f"{_META_EVAL_PREFIX}{json.dumps(llm_eval, ensure_ascii=False)}"
+        f"{_META_RISK_SEP}{json.dumps(risk_prob)}, "
+        f'"audio_bytes": {int(audio_bytes)}, "audio_sha256": {json.dumps(audio_sha256)}}}'
+    )
+
+
+def split_user_meta(meta_json: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    dump_user_meta 로 저장한 meta_json 에서 (risk_prob, llm_evaluation) 의 JSON 원문을 잘라낸다.
+    형식이 다르면(예전 데이터, assistant 턴 등) None.
+    """
+    if not meta_json or not meta_json.startswith(_META_EVAL_PREFIX):
+        return None
+    # 평가 본문 안에 같은 문자열이 있을 수 있으므로 마지막 구분자를 쓴다 (뒤쪽 필드는 숫자/해시뿐)
+    cut = meta_json.rfind(_META_RISK_SEP)
+    if cut == -1:
+        return None
+    rest = meta_json[cut + len(_META_RISK_SEP) :]
+    end = rest.find(",")
+    risk = rest[:end] if end != -1 else rest[:-1]
+    if risk != "null" and not (risk and _JSON_NUMBER_CHARS.issuperset(risk)):
+        return None
+    return risk, meta_json[len(_META_EVAL_PREFIX) : cut]
+
+
+def next_turn_index(s: DBSession, session_id: str) -> int:
+    q = select(TurnModel.turn_index).where(TurnModel.session_id == session_id).order_by(TurnModel.turn_index.desc()).limit(1)
+    last = s.execute(q).scalar_one_or_none()
+    return int(last + 1) if last is not None else 1
+
+
+def load_recent_conversation(s: DBSession, session_id: str, limit: int = 20) -> List[Dict[str, str]]:
+    q = (
+        select(TurnModel)
+        .where(TurnModel.session_id == session_id)
+        .order_by(TurnModel.turn_index.asc())
+    )
+    rows = s.execute(q).scalars().all()
+
+    convo: List[Dict[str, str]] = []
+    for r in rows:
+        if not r.text:
+            continue
+        role = "user" if r.speaker == "user" else "assistant"
+        convo.append({"role": role, "content": r.text})
+    return convo
+
+
+def record_assistant_turn(s: DBSession, session_id: str, start_ms: int, end_ms: int) -> Dict[str, Any]:
+    idx = next_turn_index(s, session_id)
+    convo = load_recent_conversation(s, session_id, limit=20)
+
+    if not convo:
+        tts_text = GREETING_TEXT
+        end_call = False
+    else:
+        tts_text, end_call = make_assistant_reply(convo)
+        if not tts_text:
+            tts_text = FALLBACK_REPLY
+
+    out_path = new_audio_path(session_id, "assistant", "wav")
+    synthesize_speech_to_wav(tts_text, out_path)
+
+    meta = {"end_call": end_call}
+    s.add(
+        TurnModel(
+            session_id=session_id,
+            turn_index=idx,
+            speaker="assistant",
+            start_ms=int(start_ms),
+            end_ms=int(end_ms),
+            text=tts_text,
+            audio_path=str(out_path),
+            meta_json=json.dumps(meta),
+        )
+    )
+    s.commit()
+
+    return {"turn_index": idx, "tts_text": tts_text, "end_call": end_call, "audio_path": out_path, "meta": meta}
+
+
+def record_user_turn(
+    s: DBSession,
+    session_id: str,
+    audio: BinaryIO,
+    ext: str,
+    start_ms: int,
+    end_ms: int,
+) -> Dict[str, Any]:
+    """audio 는 chunk 단위로 저장된다. 크기 초과 시 storage.UploadTooLarge."""
+    idx = next_turn_index(s, session_id)
+    out_path = new_audio_path(session_id, "user", ext)
+    audio_bytes, audio_sha256 = save_stream(audio, out_path)
+
+    # 음향 분석은 프로세스 풀에서 STT/LLM 평가와 동시에 진행
+    acoustic_job = submit_analysis(out_path)
+
+    raw_transcript = transcribe_audio(out_path)
+    transcript = raw_transcript or TRANSCRIPT_FAILED
+
+    context = load_recent_conversation(s, session_id, limit=10)
+    llm_eval = evaluate_transcript(transcript, context=context)
+    llm_eval["acoustic_abnormality"] = collect_analysis(acoustic_job, raw_transcript)
+    risk_prob = float(llm_eval.get("risk_probability", 0.0))
+
+    s.add(
+        TurnModel(
+            session_id=session_id,
+            turn_index=idx,
+            speaker="user",
+            start_ms=int(start_ms),
+            end_ms=int(end_ms),
+            text=transcript,
+            audio_path=str(out_path),
+            meta_json=dump_user_meta(llm_eval, risk_prob, audio_bytes, audio_sha256),
+        )
+    )
+    s.commit()
+
+    return {"turn_index": idx, "transcript": transcript, "risk_prob": risk_prob, "audio_path": out_path}
+
+
+def finalize_session(s: DBSession, row: SessionModel) -> Dict[str, Any]:
+    if not row.ended_at_utc:
+        row.ended_at_utc = _now_iso()
+
+    convo = load_recent_conversation(s, row.session_id, limit=100)
+    report_data = generate_final_report(convo)
+
+    row.final_report = json.dumps(report_data, ensure_ascii=False)
+    s.commit()
+    return report_data
@@ -0,0 +1,65 @@
+# 음향 분석 처리량 벤치마크
+# 사용법 (backend 디렉토리에서): python bench_acoustic.py [clips] [clip_sec]
+# 합성 WAV 클립으로 코어당 초당 처리 클립 수를 잰다. (워커 풀 크기 산정용)
+from __future__ import annotations
+
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from app.services.acoustic import ACOUSTIC_WORKERS, analyze_clip, get_pool, shutdown_pool
+
+SR = 16000
+
+
+def _synth_clip(path: Path, sec: float, rng: np.random.Generator) -> None:
+    # 유성 구간(배음 있는 톤)과 무음 구간을 번갈아 배치
+    parts = []
+    total = 0.0
+    while total < sec:
+        voiced = rng.uniform(0.4, 1.5)
+        f0 = rng.uniform(90, 250)
+        t = np.arange(int(voiced * SR)) / SR
+        parts.append(0.3 * (np.sin(2 * np.pi * f0 * t) + 0.5 * np.sin(4 * np.pi * f0 * t)))
+        gap = rng.uniform(0.05, 0.8)
+        parts.append(0.002 * rng.standard_normal(int(gap * SR)))
+        total += voiced + gap
+    x = np.concatenate(parts)[: int(sec * SR)]
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SR)
+        w.writeframes((x * 32767).astype("<i2").tobytes())
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    clip_sec = float(sys.argv[2]) if len(sys.argv) > 2 else 8.0
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as d:
+        paths = [Path(d) / f"clip_{i}.wav" for i in range(n)]
+        for p in paths:
+            _synth_clip(p, clip_sec, rng)
+
+        t0 = time.perf_counter()
+        for p in paths:
+            analyze_clip(str(p))
+        single = n / (time.perf_counter() - t0)
+        print(f"single process : {single:.1f} clips/s ({clip_sec:.0f}s clips)")
+
+        pool = get_pool()
+        list(pool.map(analyze_clip, [str(p) for p in paths[:ACOUSTIC_WORKERS]]))  # 워커 기동
+        t0 = time.perf_counter()
+        list(pool.map(analyze_clip, [str(p) for p in paths], chunksize=4))
+        pooled = n / (time.perf_counter() - t0)
+        shutdown_pool()
+        print(f"pool x{ACOUSTIC_WORKERS:<3}      : {pooled:.1f} clips/s, {pooled / ACOUSTIC_WORKERS:.1f} clips/s/core")
+
+
+if __name__ == "__main__":
+    main()
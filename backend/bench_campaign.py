@@ -0,0 +1,71 @@
+# 캠페인 처리량 벤치마크 (가짜 OpenAI 백엔드 + 가상 수신자, 네트워크 불필요)
+# 사용법 (backend 디렉토리에서): python bench_campaign.py [members] [concurrency] [latency_sec]
+# 임시 저장소에서 회원을 만들고 plan -> run 한 뒤 처리량과 API 요청 수를 출력한다.
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    latency = sys.argv[3] if len(sys.argv) > 3 else "0.05"
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["STORAGE_DIR"] = tmp.name
+    os.environ["OPENAI_FAKE"] = "1"
+    os.environ["OPENAI_FAKE_LATENCY"] = latency
+
+    from functools import partial
+
+    from sqlalchemy import insert
+
+    from app.db import SessionLocal, init_db
+    from app.models import Member
+    from app.scheduler import SimulatedCallee, plan_campaign, run_campaign, simulated_call
+    from app.services import quota
+    from app.storage import ensure_dirs
+
+    init_db()
+    ensure_dirs()
+    with SessionLocal() as s:
+        s.execute(
+            insert(Member),
+            [
+                {
+                    "member_no": str(100000 + i),
+                    "customer_name": "회원",
+                    "guardian_name": "보호자",
+                    "risk": i % 101,
+                    "customer_phone": "010-0000-0000",
+                    "guardian_phone": "010-1111-1111",
+                    "created_at_utc": "2026-01-01T00:00:00+00:00",
+                }
+                for i in range(n)
+            ],
+        )
+        s.commit()
+
+    # 분당 한도 예시 (0 이면 무제한)
+    quota.configure(
+        stt=float(os.getenv("BENCH_RPM_STT", "0")),
+        chat=float(os.getenv("BENCH_RPM_CHAT", "0")),
+        tts=float(os.getenv("BENCH_RPM_TTS", "0")),
+    )
+
+    t0 = time.perf_counter()
+    plan = plan_campaign("bench")
+    print(f"plan: {plan['planned']} tasks in {time.perf_counter() - t0:.2f}s")
+
+    caller = partial(simulated_call, callee=SimulatedCallee(answer_rate=0.9, seed=0))
+    stats = run_campaign(plan["campaign_id"], concurrency=concurrency, caller=caller)
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
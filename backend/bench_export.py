@@ -0,0 +1,79 @@
+# 대량 내보내기 벤치마크
+# 사용법 (backend 디렉토리에서): python bench_export.py [turns]
+# 임시 SQLite 에 턴을 채운 뒤 JSONL/CSV 내보내기 속도와 피크 RSS 를 잰다.
+from __future__ import annotations
+
+import json
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.export import iter_export
+
+TURNS_PER_SESSION = 10
+
+
+def _populate(engine, n: int) -> None:
+    meta = json.dumps(
+        {
+            "llm_evaluation": {
+                "semantic_impairment": {"pronoun_overuse": 1, "vagueness": 0, "lexical_poverty": 2, "repetition": 0},
+                "information_impairment": {"missing_core_info": 0, "low_specificity": 1, "inappropriate_reference": 0},
+                "syntactic_impairment": {"verb_reduction": 0, "sentence_fragments": 1, "syntactic_simplification": 0},
+                "acoustic_abnormality": {"pause_count": 3, "pause_ratio": 0.21, "mean_pause_sec": 0.6, "speech_rate_sps": 3.1},
+                "risk_probability": 0.2,
+                "rationale": {"summary": "요약", "evidence_sentences": ["그거 있잖아"]},
+            },
+            "risk_prob": 0.2,
+        },
+        ensure_ascii=False,
+    )
+    n_sessions = (n + TURNS_PER_SESSION - 1) // TURNS_PER_SESSION
+    raw = engine.raw_connection()
+    cur = raw.cursor()
+    cur.executemany(
+        "INSERT INTO sessions (session_id, started_at_utc, member_no) VALUES (?, ?, ?)",
+        ((f"{i:016x}", f"2026-01-{1 + i % 28:02d}T09:00:00+00:00", str(1000 + i % 100)) for i in range(n_sessions)),
+    )
+    cur.executemany(
+        "INSERT INTO turns (session_id, turn_index, speaker, start_ms, end_ms, text, meta_json) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            (f"{i // TURNS_PER_SESSION:016x}", i % TURNS_PER_SESSION, "user", 0, 1000, "오늘은 밥을 먹었어요", meta)
+            for i in range(n)
+        ),
+    )
+    raw.commit()
+    raw.close()
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as d:
+        engine = create_engine(f"sqlite:///{Path(d) / 'bench.sqlite3'}", future=True)
+        Base.metadata.create_all(engine)
+        _populate(engine, n)
+        Session = sessionmaker(bind=engine, future=True)
+
+        for fmt in ("jsonl", "csv"):
+            out = Path(d) / f"out.{fmt}"
+            t0 = time.perf_counter()
+            with Session() as s, out.open("w", encoding="utf-8") as f:
+                for chunk in iter_export(s, fmt):
+                    f.write(chunk)
+            dt = time.perf_counter() - t0
+            size_mb = out.stat().st_size / 1e6
+            print(f"{fmt:<5} {n} turns in {dt:.1f}s ({n / dt:,.0f} turns/s, {size_mb:.0f} MB)")
+            out.unlink()
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"peak RSS {rss:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
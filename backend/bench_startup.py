@@ -0,0 +1,39 @@
+# 워커 시작 시간 벤치마크
+# 사용법 (backend 디렉토리에서): python bench_startup.py
+# 새 프로세스에서 app.main import + lifespan 시작까지 걸리는 시간을 잰다.
+from __future__ import annotations
+
+import statistics
+import subprocess
+import sys
+
+RUNS = 7
+
+_CHILD = """
+import time
+t0 = time.perf_counter()
+from app.main import app
+t1 = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app) as c:
+    t2 = time.perf_counter()
+    ok = c.get("/healthz").status_code == 200
+print(f"{t1 - t0:.4f} {t2 - t1:.4f} {int(ok)}")
+"""
+
+
+def main() -> None:
+    imports, startups = [], []
+    for _ in range(RUNS):
+        out = subprocess.run(
+            [sys.executable, "-c", _CHILD], capture_output=True, text=True, check=True
+        ).stdout.split()
+        imports.append(float(out[0]))
+        startups.append(float(out[1]))
+
+    print(f"import  median={statistics.median(imports) * 1000:.0f} ms")
+    print(f"startup median={statistics.median(startups) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# 업로드 경로 메모리 벤치마크
+# 사용법 (backend 디렉토리에서): python bench_upload.py
+# 임시 저장소 + 가짜 OpenAI 백엔드로 uvicorn 서버를 띄우고, 실제 /turn/user 경로
+# (멀티파트 파싱 -> UploadFile -> save_stream) 로 업로드한 뒤 서버 프로세스의 피크 RSS 를 잰다.
+# 업로드 크기와 무관하게 피크 RSS 가 일정하게 유지되는지, chunked 초과 업로드가 413 으로 끊기는지 확인한다.
+from __future__ import annotations
+
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+
+SIZES_MB = [1, 8, 32, 128]
+CHUNK = 1024 * 1024
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _peak_rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _multipart(session_id: str, size: int, boundary: str):
+    """디스크/메모리에 본문 전체를 만들지 않고 chunk 로 흘려보내는 multipart 본문 (chunked 전송)"""
+    def field(name: str, value: str) -> bytes:
+        return f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+
+    yield field("session_id", session_id) + field("start_ms", "0") + field("end_ms", "1000")
+    yield (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="audio"; filename="voice.webm"\r\n'
+        f"Content-Type: audio/webm\r\n\r\n"
+    ).encode()
+    block = b"\0" * CHUNK
+    left = size
+    while left > 0:
+        yield block[: min(CHUNK, left)]
+        left -= CHUNK
+    yield f"\r\n--{boundary}--\r\n".encode()
+
+
+def _run_server(max_upload: int, storage: str):
+    port = _free_port()
+    env = dict(
+        os.environ,
+        STORAGE_DIR=storage,
+        OPENAI_FAKE="1",
+        MAX_UPLOAD_BYTES=str(max_upload),
+        ACOUSTIC_WORKERS="1",
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            if httpx.get(f"{base}/healthz").status_code == 200:
+                return proc, base
+        except httpx.TransportError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+def _upload(base: str, size: int) -> int:
+    sid = httpx.post(f"{base}/session/start").json()["session_id"]
+    boundary = uuid.uuid4().hex
+    r = httpx.post(
+        f"{base}/turn/user",
+        content=_multipart(sid, size, boundary),
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+        timeout=120,
+    )
+    return r.status_code
+
+
+def main() -> None:
+    for mb in SIZES_MB:
+        with tempfile.TemporaryDirectory() as d:
+            proc, base = _run_server(1 << 40, d)
+            try:
+                t0 = time.perf_counter()
+                status = _upload(base, mb * CHUNK)
+                dt = time.perf_counter() - t0
+                print(f"{mb:>5} MB  status={status}  server_peak_rss={_peak_rss_mb(proc.pid):.1f} MB  {dt:.2f}s")
+            finally:
+                proc.terminate()
+                proc.wait()
+
+    # chunked(Content-Length 없음) 업로드가 한도에서 끊기는지
+    with tempfile.TemporaryDirectory() as d:
+        proc, base = _run_server(8 * CHUNK, d)
+        try:
+            status = _upload(base, 64 * CHUNK)
+            print(f"chunked 64 MB over 8 MB limit -> status={status}")
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()